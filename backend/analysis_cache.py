@@ -0,0 +1,238 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from process_local import ProcessLocal
+
+
+def content_hash(source, chunk_size=1024 * 1024):
+    """
+    SHA-256 of an upload's encoded bytes
+
+    Args:
+        source: File path, bytes-like object or seekable binary stream. A
+            stream is rewound to where it started so it can still be decoded.
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    elif isinstance(source, str):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    else:
+        start = source.tell()
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+        source.seek(start)
+
+    return digest.hexdigest()
+
+
+def _to_sqlite_int(value):
+    """Store an unsigned 64-bit hash in sqlite's signed INTEGER"""
+    if value is None:
+        return None
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _from_sqlite_int(value):
+    """Inverse of _to_sqlite_int"""
+    if value is None:
+        return None
+    return value + (1 << 64) if value < 0 else value
+
+
+class AnalysisCache:
+    """
+    Two-tier cache of analysis results keyed by upload content hash
+
+    The memory tier is an LRU bounded by entry count with a TTL. The optional
+    sqlite tier survives restarts; hits there are promoted into memory.
+    Entries are tagged with `version`, so changing the analyzer (model,
+    settings, algorithm) makes old entries unreachable and they are purged
+    from disk when the file is opened. Near-duplicate lookups by perceptual
+    hash are served from the memory tier only. The sqlite connection is
+    opened on first use in each process.
+    """
+
+    def __init__(self, version, max_entries=1024, ttl=24 * 3600, disk_path=None, phash_distance=-1):
+        """
+        Args:
+            version (str): Analyzer version key
+            max_entries (int): Memory tier capacity
+            ttl (float): Seconds an entry stays valid (both tiers)
+            disk_path (str): sqlite file for the persistent tier, None to disable
+            phash_distance (int): Max Hamming distance for a near-duplicate
+                hit, negative to disable perceptual matching
+        """
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.phash_distance = phash_distance
+
+        self._memory = OrderedDict()  # content hash -> (expires_at, phash, serialized result)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.near_duplicate_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.disk_path = disk_path
+        self._db = ProcessLocal(self._open) if disk_path else None
+
+    @property
+    def uses_phash(self):
+        """Whether near-duplicate lookups are enabled"""
+        return self.phash_distance >= 0
+
+    def get(self, key):
+        """
+        Look up a cached analysis by exact content hash
+
+        Args:
+            key (str): Content hash of the upload
+
+        Returns:
+            dict: A fresh copy of the cached analysis, or None on a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] < now:
+                del self._memory[key]
+                entry = None
+
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return json.loads(entry[2])
+
+            db = self._connection()
+            if db is not None:
+                row = db.execute(
+                    "SELECT phash, expires_at, result FROM analysis_cache WHERE content_hash = ? AND version = ?",
+                    (key, self.version)
+                ).fetchone()
+                if row is not None and row[1] >= now:
+                    self._remember(key, row[1], _from_sqlite_int(row[0]), row[2])
+                    self.disk_hits += 1
+                    return json.loads(row[2])
+
+            self.misses += 1
+            return None
+
+    def find_similar(self, phash):
+        """
+        Look up a near-duplicate analysis by perceptual hash
+
+        Only consulted after an exact miss, so a hit here is counted on top
+        of that miss.
+
+        Args:
+            phash (int): 64-bit perceptual hash of the decoded image
+
+        Returns:
+            dict: A fresh copy of the closest cached analysis within
+                phash_distance bits, or None
+        """
+        if not self.uses_phash:
+            return None
+
+        with self._lock:
+            serialized = self._find_near_duplicate(phash, time.time())
+            if serialized is None:
+                return None
+            self.near_duplicate_hits += 1
+            return json.loads(serialized)
+
+    def put(self, key, result, phash=None):
+        """Store an analysis under its content hash (and perceptual hash)"""
+        serialized = json.dumps(result)
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._remember(key, expires_at, phash, serialized)
+
+            db = self._connection()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?, ?, ?)",
+                    (key, self.version, _to_sqlite_int(phash), expires_at, serialized)
+                )
+                db.commit()
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM analysis_cache")
+                db.commit()
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            served = self.hits + self.disk_hits + self.near_duplicate_hits
+            return {
+                "version": self.version,
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "near_duplicate_hits": self.near_duplicate_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": served / lookups if lookups else 0.0
+            }
+
+    def _connection(self):
+        """This process's sqlite connection, None without a disk tier"""
+        return self._db.get() if self._db is not None else None
+
+    def _open(self):
+        """Open the sqlite file and purge entries of other versions or past their TTL"""
+        db = sqlite3.connect(self.disk_path, check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            "content_hash TEXT PRIMARY KEY, version TEXT, phash INTEGER, expires_at REAL, result TEXT)"
+        )
+        db.execute("DELETE FROM analysis_cache WHERE version != ? OR expires_at < ?", (self.version, time.time()))
+        db.commit()
+        return db
+
+    def _remember(self, key, expires_at, phash, serialized):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = (expires_at, phash, serialized)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _find_near_duplicate(self, phash, now):
+        """Closest unexpired memory entry within phash_distance bits"""
+        best = None
+        best_distance = self.phash_distance + 1
+
+        for key, (expires_at, entry_phash, serialized) in self._memory.items():
+            if entry_phash is None or expires_at < now:
+                continue
+            distance = bin(entry_phash ^ phash).count('1')
+            if distance < best_distance:
+                best, best_distance = key, distance
+
+        if best is None:
+            return None
+        self._memory.move_to_end(best)
+        return self._memory[best][2]
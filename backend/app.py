@@ -1,16 +1,37 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Request, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+import gc
+import json
+import multiprocessing
 import os
-import cv2
-import numpy as np
-from PIL import Image
-import base64
-import io
+import tempfile
+import zipfile
 from clothing_analyzer import ClothingAnalyzer
 from style_matcher import StyleMatcher
 from web_searcher import WebSearcher
+from config import Config
+from job_queue import FAILED, PRIORITIES, SUCCEEDED, JobQueue, QueueFullError
+
+
+class UploadRequest(Request):
+    """Request that keeps uploaded files in memory below the spool threshold"""
+    
+    @property
+    def max_content_length(self):
+        # Batch uploads may carry many images, each up to the single-image limit
+        limit = super().max_content_length
+        if limit is not None and self.endpoint == 'analyze_batch':
+            return limit * Config.BATCH_PAYLOAD_FACTOR
+        return limit
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Werkzeug spools anything over 500KB to disk; only roll over past our threshold
+        return tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_THRESHOLD, mode='rb+')
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app)
 
 # Configure upload folder
@@ -18,10 +39,66 @@ UPLOAD_FOLDER = '../uploads'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-# Initialize AI components
-clothing_analyzer = ClothingAnalyzer()
-style_matcher = StyleMatcher()
-web_searcher = WebSearcher()
+def create_components():
+    """
+    Build the analyzer, matcher, searcher and job queue of the server
+    
+    The classification model is loaded according to Config.MODEL_LOAD_MODE:
+      background - start serving immediately, load on a background thread
+      preload    - load now; with a pre-forking server (e.g.
+                   `gunicorn --preload`) workers then share the weights copy-on-write
+      lazy       - load on the first request that needs it
+    
+    Returns:
+        tuple: (ClothingAnalyzer, StyleMatcher, WebSearcher, JobQueue)
+    """
+    analyzer = ClothingAnalyzer(load_model=False)
+    if Config.MODEL_LOAD_MODE == 'preload':
+        analyzer.load_model()
+    elif Config.MODEL_LOAD_MODE == 'background':
+        analyzer.load_model_async()
+    if Config.INFERENCE_BATCH_SIZE > 1:
+        analyzer.enable_micro_batching(Config.INFERENCE_BATCH_SIZE, Config.INFERENCE_BATCH_WAIT_MS)
+    if Config.ANALYSIS_CACHE_SIZE > 0:
+        analyzer.enable_cache(
+            max_entries=Config.ANALYSIS_CACHE_SIZE,
+            ttl=Config.ANALYSIS_CACHE_TTL,
+            disk_path=Config.ANALYSIS_CACHE_PATH or None,
+            phash_distance=Config.ANALYSIS_CACHE_PHASH_DISTANCE
+        )
+    if Config.FEATURE_WORKERS > 0:
+        # With preload the pool starts in each forked worker on first use instead
+        analyzer.enable_process_pool(
+            Config.FEATURE_WORKERS,
+            warm_up=Config.MODEL_LOAD_MODE != 'preload'
+        )
+    
+    # Background jobs (/api/jobs) run on their own worker threads, not request
+    # threads; their state is shared with the other server processes through
+    # a sqlite file in the instance folder unless JOB_STORE_PATH says otherwise
+    store_path = Config.JOB_STORE_PATH
+    if store_path is None:
+        os.makedirs(app.instance_path, exist_ok=True)
+        store_path = os.path.join(app.instance_path, 'jobs.sqlite3')
+    queue = JobQueue(
+        workers=Config.JOB_WORKERS,
+        max_depth=Config.JOB_QUEUE_MAX_DEPTH,
+        result_ttl=Config.JOB_RESULT_TTL,
+        store_path=store_path or None,
+        lease_ttl=Config.JOB_LEASE_TTL
+    )
+    
+    return analyzer, StyleMatcher(cache_size=Config.MATCH_CACHE_SIZE), WebSearcher(), queue
+
+# Helper processes started with multiprocessing's spawn method (the feature
+# pool's workers) import this module again when the server runs as
+# `python app.py`. Only the server process itself builds the components.
+if multiprocessing.parent_process() is None:
+    clothing_analyzer, style_matcher, web_searcher, job_queue = create_components()
+    if Config.MODEL_LOAD_MODE == 'preload':
+        # Move everything allocated so far out of the GC's reach so collections in
+        # forked workers do not touch (and copy) the shared pages
+        gc.freeze()
 
 @app.route('/', methods=['GET'])
 def home():
@@ -30,14 +107,45 @@ def home():
         "version": "1.0.0",
         "endpoints": {
             "analyze_clothing": "/api/analyze",
+            "analyze_batch": "/api/analyze-batch",
             "find_matches": "/api/find-matches",
-            "health": "/api/health"
+            "jobs": "/api/jobs",
+            "health": "/api/health",
+            "stats": "/api/stats"
         }
     })
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "message": "API is running normally"})
+    model = clothing_analyzer.model_status()
+    
+    if model["state"] == "ready":
+        return jsonify({"status": "healthy", "message": "API is running normally", "model": model})
+    if model["state"] == "failed":
+        # Still serving, with heuristic classification only
+        return jsonify({"status": "degraded", "message": "Model failed to load", "model": model})
+    if model["state"] == "cold":
+        return jsonify({"status": "healthy", "message": "Model loads on first request", "model": model})
+    return jsonify({"status": "warming", "message": "Model is loading", "model": model}), 503
+
+@app.route('/api/stats', methods=['GET'])
+def service_stats():
+    """
+    Cache and batching counters for monitoring
+    """
+    return jsonify({
+        "analysis_cache": clothing_analyzer.cache.stats() if clothing_analyzer.cache else None,
+        "classifier_batcher": clothing_analyzer.batcher.stats() if clothing_analyzer.batcher else None,
+        "match_cache": style_matcher.cache_stats(),
+        "feature_pool": clothing_analyzer.feature_pool.stats() if clothing_analyzer.feature_pool else None,
+        "rate_limiter": web_searcher.rate_limiter.stats(),
+        "http_pools": web_searcher.pool_stats(),
+        "search_streaming": web_searcher.stream_stats(),
+        "browser_pool": web_searcher.browser_stats(),
+        "search_cache": web_searcher.search_cache.stats() if web_searcher.search_cache else None,
+        "query_planner": web_searcher.plan_stats(),
+        "job_queue": job_queue.stats()
+    })
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_clothing():
@@ -53,16 +161,8 @@ def analyze_clothing():
             return jsonify({"error": "No file selected"}), 400
         
         if file and allowed_file(file.filename):
-            # Save uploaded file
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            # Analyze the clothing item
-            analysis_result = clothing_analyzer.analyze_image(filepath)
-            
-            # Clean up uploaded file
-            os.remove(filepath)
+            # Analyze the clothing item straight from the upload buffer
+            analysis_result = clothing_analyzer.analyze_stream(file.stream)
             
             return jsonify({
                 "success": True,
@@ -74,6 +174,148 @@ def analyze_clothing():
     except Exception as e:
         return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
 
+@app.route('/api/analyze-batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analyze several clothing images in one request
+    
+    Accepts any number of `images` files (multipart list) and/or zip
+    archives of images. Every image may be up to MAX_CONTENT_LENGTH and the
+    whole request up to MAX_CONTENT_LENGTH x BATCH_PAYLOAD_FACTOR. Results
+    come back in upload order (archive members in archive order), each with
+    its own success flag and error.
+    """
+    try:
+        uploads = request.files.getlist('images') + request.files.getlist('image')
+        if not uploads:
+            return jsonify({"error": "No image files provided"}), 400
+        
+        item_limit = app.config['MAX_CONTENT_LENGTH']
+        total_limit = request.max_content_length
+        
+        # (filename, source or None, error) per item, counted as they are
+        # read so an oversized batch stops before the rest is extracted
+        items = []
+        for file in uploads:
+            if is_zip_upload(file):
+                try:
+                    items.extend(read_zip_images(file.stream, item_limit, total_limit, Config.BATCH_MAX_IMAGES - len(items)))
+                except zipfile.BadZipFile:
+                    items.append((file.filename, None, "Invalid zip archive"))
+            elif file.filename and allowed_file(file.filename):
+                if item_limit is not None and upload_size(file.stream) > item_limit:
+                    items.append((file.filename, None, "Image exceeds the size limit"))
+                else:
+                    items.append((file.filename, file.stream, None))
+            else:
+                items.append((file.filename, None, "Invalid file type"))
+            
+            if len(items) > Config.BATCH_MAX_IMAGES:
+                raise TooManyImages()
+        
+        # Decode in parallel and classify in batched forward passes
+        valid = [index for index, (_, source, _) in enumerate(items) if source is not None]
+        analyses = dict(zip(valid, clothing_analyzer.analyze_batch([items[index][1] for index in valid])))
+        
+        results = []
+        for index, (filename, _, error) in enumerate(items):
+            analysis = analyses.get(index)
+            if analysis is None or "error" in analysis:
+                results.append({
+                    "filename": filename,
+                    "success": False,
+                    "error": error or analysis["error"]
+                })
+            else:
+                results.append({"filename": filename, "success": True, "analysis": analysis})
+        
+        return jsonify({
+            "success": True,
+            "count": len(results),
+            "failed": sum(1 for result in results if not result["success"]),
+            "results": results
+        })
+    
+    except TooManyImages:
+        return jsonify({"error": f"Too many images, the limit is {Config.BATCH_MAX_IMAGES}"}), 413
+    except RequestEntityTooLarge:
+        return jsonify({"error": f"Batch upload exceeds {request.max_content_length} bytes"}), 413
+    except Exception as e:
+        return jsonify({"error": f"Batch analysis failed: {str(e)}"}), 500
+
+class TooManyImages(Exception):
+    """A batch upload holds more than BATCH_MAX_IMAGES images"""
+
+def upload_size(stream):
+    """Size in bytes of an uploaded file's stream, leaving it at the start"""
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+def is_zip_upload(file):
+    """Whether an uploaded file is a zip archive"""
+    return (file.filename or '').lower().endswith('.zip') or file.mimetype in ('application/zip', 'application/x-zip-compressed')
+
+def read_zip_images(stream, item_limit, total_limit, max_items):
+    """
+    Extract the images of an uploaded zip archive
+    
+    The member count and declared sizes are checked from the archive's
+    directory before anything is decompressed; sizes are then checked
+    again against the real decompressed bytes, since headers can lie, so
+    a zip bomb stops at the limit.
+    
+    Args:
+        stream: The uploaded archive
+        item_limit: Bytes allowed per image, or None
+        total_limit: Bytes allowed for all images together, or None
+        max_items: Members the batch still has room for
+    
+    Returns:
+        list: (filename, bytes or None, error or None) per archive member
+    
+    Raises:
+        TooManyImages: The archive holds more than max_items members
+        RequestEntityTooLarge: The images' declared sizes exceed total_limit
+    """
+    items = []
+    remaining = total_limit
+    
+    with zipfile.ZipFile(stream) as archive:
+        # Skip folders and macOS resource forks
+        members = [
+            info for info in archive.infolist()
+            if not (info.is_dir() or info.filename.startswith('__MACOSX/') or os.path.basename(info.filename).startswith('.'))
+        ]
+        if len(members) > max_items:
+            raise TooManyImages()
+        if total_limit is not None and sum(info.file_size for info in members if allowed_file(info.filename)) > total_limit:
+            raise RequestEntityTooLarge()
+        
+        for info in members:
+            name = info.filename
+            if not allowed_file(name):
+                items.append((name, None, "Invalid file type"))
+                continue
+            
+            limit = min(item_limit, remaining) if remaining is not None else item_limit
+            if limit is not None and info.file_size > limit:
+                items.append((name, None, "Image exceeds the size limit"))
+                continue
+            
+            with archive.open(info) as member:
+                data = member.read(limit + 1) if limit is not None else member.read()
+            if limit is not None and len(data) > limit:
+                items.append((name, None, "Image exceeds the size limit"))
+                continue
+            
+            if remaining is not None:
+                remaining -= len(data)
+            items.append((name, data, None))
+    
+    return items
+
 @app.route('/api/find-matches', methods=['POST'])
 def find_matching_items():
     """
@@ -91,10 +333,9 @@ def find_matching_items():
         # Find style matches
         style_recommendations = style_matcher.find_matches(analysis, search_preferences)
         
-        # Search the web for actual products
+        # Search the web for actual products (all recommendations concurrently)
         search_results = []
-        for recommendation in style_recommendations:
-            products = web_searcher.search_products(recommendation)
+        for products in web_searcher.search_products_many(style_recommendations):
             search_results.extend(products)
         
         return jsonify({
@@ -110,6 +351,10 @@ def find_matching_items():
 def analyze_and_find_matches():
     """
     Combined endpoint: analyze image and find matches in one request
+    
+    With `?stream=ndjson` (or `Accept: application/x-ndjson`) the response is
+    streamed as one JSON event per line, and with `?stream=sse` (or
+    `Accept: text/event-stream`) as Server-Sent Events. See stream_analyze_and_match.
     """
     try:
         if 'image' not in request.files:
@@ -122,28 +367,23 @@ def analyze_and_find_matches():
             return jsonify({"error": "No file selected"}), 400
         
         if file and allowed_file(file.filename):
-            # Save uploaded file
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+            preferences = json.loads(search_preferences) if search_preferences else {}
             
-            # Analyze the clothing item
-            analysis_result = clothing_analyzer.analyze_image(filepath)
+            # Analyze the clothing item straight from the upload buffer
+            analysis_result = clothing_analyzer.analyze_stream(file.stream)
+            
+            stream_format = requested_stream_format()
+            if stream_format:
+                return stream_analyze_and_match(analysis_result, preferences, stream_format)
             
             # Find matches
-            import json
-            preferences = json.loads(search_preferences) if search_preferences else {}
             style_recommendations = style_matcher.find_matches(analysis_result, preferences)
             
-            # Search for products
+            # Search for products (all recommendations concurrently)
             search_results = []
-            for recommendation in style_recommendations[:5]:  # Limit initial recommendations
-                products = web_searcher.search_products(recommendation)
+            for products in web_searcher.search_products_many(style_recommendations[:5]):  # Limit initial recommendations
                 search_results.extend(products)
             
-            # Clean up uploaded file
-            os.remove(filepath)
-            
             return jsonify({
                 "success": True,
                 "analysis": analysis_result,
@@ -156,21 +396,187 @@ def analyze_and_find_matches():
     except Exception as e:
         return jsonify({"error": f"Processing failed: {str(e)}"}), 500
 
+def requested_stream_format():
+    """'ndjson' or 'sse' if the client asked for a streamed response, else None"""
+    stream = request.args.get('stream', '').lower()
+    if stream in ('ndjson', 'sse'):
+        return stream
+    
+    accept = request.headers.get('Accept', '')
+    if 'application/x-ndjson' in accept:
+        return 'ndjson'
+    if 'text/event-stream' in accept:
+        return 'sse'
+    return None
+
+def stream_analyze_and_match(analysis_result, preferences, stream_format):
+    """
+    Streamed variant of /api/analyze-and-match
+    
+    The upload is analyzed before the response starts (the request's file
+    is closed once the view returns), so the analysis event goes out with
+    the first byte. The remaining events are sent as each stage finishes:
+        analysis         {"event": "analysis", "analysis": {...}}
+        recommendations  {"event": "recommendations", "recommendations": [...]}
+        products         {"event": "products", "recommendation": i, "products": [...]}
+                         once per finished product query, relevance-scored
+        done             {"event": "done", "success": true, "products": [...]}
+                         the same final product list as the non-streamed response
+        error            {"event": "error", "error": "..."} ends the stream on failure
+    """
+    def encode(event):
+        payload = json.dumps(event)
+        if stream_format == 'sse':
+            return f"event: {event['event']}\ndata: {payload}\n\n"
+        return payload + "\n"
+    
+    def generate():
+        try:
+            yield encode({"event": "analysis", "analysis": analysis_result})
+            for event in match_events(analysis_result, preferences):
+                yield encode(event)
+        
+        except Exception as e:
+            yield encode({"event": "error", "error": f"Processing failed: {str(e)}"})
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(
+        generate(),
+        mimetype=mimetype,
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Keep reverse proxies from buffering the stream
+        }
+    )
+
+def match_events(analysis_result, preferences):
+    """
+    Recommendation and product events for an analyzed item, as each stage finishes
+    
+    Yields the recommendations, then one products event per finished product
+    query, then a done event with the final ranked list (see stream_analyze_and_match).
+    """
+    style_recommendations = style_matcher.find_matches(analysis_result, preferences)
+    yield {"event": "recommendations", "recommendations": style_recommendations}
+    
+    # Limit initial recommendations; send each query's products as it completes
+    searched = style_recommendations[:5]
+    found = [{} for _ in searched]
+    for index, query, products in web_searcher.iter_search_products(searched):
+        found[index][query] = products
+        yield {"event": "products", "recommendation": index, "products": products}
+    
+    # Merge in query order so the final list matches the non-streamed response
+    search_results = []
+    for recommendation, batches in zip(searched, found):
+        products = [product for query in sorted(batches) for product in batches[query]]
+        search_results.extend(web_searcher.rank_products(products, recommendation))
+    
+    yield {"event": "done", "success": True, "products": search_results[:15]}
+
+def run_analyze_and_match_job(job, image_data, preferences):
+    """
+    Job body for /api/jobs: the analyze-and-match pipeline with partial results
+    
+    Progress is published on the job as it happens (analysis, recommendations,
+    products found so far) and cancellation is honoured between stages.
+    """
+    analysis_result = clothing_analyzer.analyze_bytes(image_data)
+    job.update(stage="analyzed", analysis=analysis_result)
+    job.check_cancelled()
+    
+    products_so_far = []
+    for event in match_events(analysis_result, preferences):
+        job.check_cancelled()
+        if event["event"] == "recommendations":
+            job.update(stage="searching", recommendations=event["recommendations"])
+        elif event["event"] == "products":
+            products_so_far = products_so_far + event["products"]
+            job.update(products=products_so_far)
+        elif event["event"] == "done":
+            job.update(stage="done", products=event["products"])
+            return {
+                "success": True,
+                "analysis": analysis_result,
+                "recommendations": job.partial.get("recommendations", []),
+                "products": event["products"]
+            }
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue an analyze-and-match job and return its id immediately
+    
+    Takes the same form fields as /api/analyze-and-match plus an optional
+    `priority` (low, normal or high). Poll GET /api/jobs/<id> for progress.
+    """
+    try:
+        if 'image' not in request.files:
+            return jsonify({"error": "No image file provided"}), 400
+        
+        file = request.files['image']
+        search_preferences = request.form.get('preferences', '{}')
+        priority = request.form.get('priority', 'normal').lower()
+        
+        if file.filename == '':
+            return jsonify({"error": "No file selected"}), 400
+        if priority not in PRIORITIES:
+            return jsonify({"error": f"Invalid priority, expected one of: {', '.join(PRIORITIES)}"}), 400
+        
+        if file and allowed_file(file.filename):
+            preferences = json.loads(search_preferences) if search_preferences else {}
+            
+            # The upload is closed when this request ends, so the job gets its bytes
+            job = job_queue.submit(
+                run_analyze_and_match_job, file.read(), preferences,
+                priority=PRIORITIES[priority]
+            )
+            
+            response = jsonify({
+                "success": True,
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/jobs/{job.id}"
+            })
+            response.headers['Location'] = f"/api/jobs/{job.id}"
+            return response, 202
+        
+        return jsonify({"error": "Invalid file type"}), 400
+    
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 429, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({"error": f"Could not queue job: {str(e)}"}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Status, partial results and (once finished) the result of a job
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify(dict(job.to_dict(), queue_position=job_queue.position(job)))
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancel a queued or running job
+    """
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status in (SUCCEEDED, FAILED):
+        return jsonify({"error": f"Job already {job.status}", "status": job.status}), 409
+    
+    return jsonify({"success": True, "status": job.status, "cancel_requested": True})
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def secure_filename(filename):
-    """Create a secure filename"""
-    import re
-    import uuid
-    # Keep only alphanumeric characters and basic punctuation
-    filename = re.sub(r'[^a-zA-Z0-9._-]', '', filename)
-    # Add UUID to prevent conflicts
-    name, ext = os.path.splitext(filename)
-    return f"{name}_{uuid.uuid4().hex[:8]}{ext}"
-
 if __name__ == '__main__':
     # Create upload directory if it doesn't exist
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from process_local import ProcessLocal
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-item calls into batches
+
+    Callers submit one item at a time from any thread. A background worker
+    waits for up to `max_wait_ms` after the first item arrives (or until
+    `max_batch_size` items are queued), runs `process_batch` once on the
+    whole batch and dispatches each result back to its caller's future.
+    """
+
+    def __init__(self, process_batch, max_batch_size=8, max_wait_ms=10, name='micro-batcher'):
+        """
+        Args:
+            process_batch (callable): Takes a list of items and returns a list
+                of results in the same order
+            max_batch_size (int): Largest batch passed to process_batch
+            max_wait_ms (float): How long to hold the first item of a batch
+                waiting for more to arrive
+            name (str): Name of the worker thread
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+
+        self.name = name
+        self._closed = False
+        self._local = ProcessLocal(self._start_worker)  # (queue, worker thread)
+        self._local.get()
+
+        # Counters for monitoring
+        self.batches_run = 0
+        self.items_processed = 0
+
+    def _start_worker(self):
+        """Create the queue and worker thread for the current process"""
+        queued = queue.Queue()
+        worker = threading.Thread(target=self._run, args=(queued,), name=self.name, daemon=True)
+        worker.start()
+        return queued, worker
+
+    def submit(self, item):
+        """Queue an item and return a Future for its result"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        queued, _ = self._local.get()
+        future = Future()
+        queued.put((item, future))
+        return future
+
+    def __call__(self, item, timeout=None):
+        """Submit an item and block until its result is ready"""
+        return self.submit(item).result(timeout=timeout)
+
+    def close(self):
+        """Stop the worker after draining any queued items"""
+        if not self._closed:
+            self._closed = True
+            started = self._local.peek()
+            if started is not None:
+                queued, worker = started
+                queued.put(None)
+                worker.join()
+
+    def stats(self):
+        """Batch counters for monitoring"""
+        return {
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "average_batch_size": self.items_processed / self.batches_run if self.batches_run else 0.0,
+            "queued": self._queued()
+        }
+
+    def _queued(self):
+        """Items waiting in this process's queue"""
+        started = self._local.peek()
+        return started[0].qsize() if started is not None else 0
+
+    def _collect(self, queued, first):
+        """Gather up to max_batch_size items, waiting at most max_wait after the first"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = queued.get(timeout=remaining) if remaining > 0 else queued.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Re-post the shutdown marker once this batch is done
+                queued.put(None)
+                break
+            batch.append(entry)
+
+        return batch
+
+    def _run(self, queued):
+        """Worker loop: collect, process, dispatch"""
+        while True:
+            first = queued.get()
+            if first is None:
+                break
+
+            batch = self._collect(queued, first)
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            try:
+                results = self.process_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError("process_batch returned the wrong number of results")
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            finally:
+                self.batches_run += 1
+                self.items_processed += len(items)
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
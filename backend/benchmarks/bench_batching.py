@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-image vs batched ViT classification throughput
+
+Needs the full requirements (torch + transformers) and the model weights.
+
+Usage:
+    python benchmarks/bench_batching.py [--images 32] [--batch-sizes 1 4 8 16]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clothing_analyzer import ClothingAnalyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=32)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    images = [Image.fromarray(rng.integers(0, 256, size=(480, 360, 3), dtype=np.uint8)) for _ in range(args.images)]
+
+    analyzer = ClothingAnalyzer()
+    analyzer.classifier(images[0])  # warm-up
+
+    start = time.perf_counter()
+    for image in images:
+        analyzer.classifier(image)
+    baseline = args.images / (time.perf_counter() - start)
+    print(f"{'per-image':>12}: {baseline:7.1f} images/sec")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        for offset in range(0, len(images), batch_size):
+            analyzer._run_classifier_batch(images[offset:offset + batch_size])
+        rate = args.images / (time.perf_counter() - start)
+        print(f"{'batch=' + str(batch_size):>12}: {rate:7.1f} images/sec ({rate / baseline:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled browsers vs launching a browser per Selenium search
+
+Runs without Chrome: a fake driver with a configurable launch cost loads
+pages from a local static HTML server. Besides timing both strategies it
+checks the pool's guarantees: no driver is leaked when searches raise,
+crashed browsers are replaced and drivers are recycled after max_pages.
+
+Usage:
+    python benchmarks/bench_browser_pool.py [--searches 40] [--threads 4] [--launch-ms 800]
+"""
+
+import argparse
+import http.server
+import os
+import socketserver
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_pool import BrowserPool
+
+PAGE = ('<html><body>' + ''.join(
+    f'<div data-component-type="s-search-result"><h2><a href="/dp/{i}"><span>Jeans {i}</span></a></h2></div>'
+    for i in range(20)
+) + '</body></html>').encode()
+
+
+class StaticHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class FakeDriver:
+    """Stands in for webdriver.Chrome: slow to launch, loads pages over HTTP"""
+
+    alive = 0
+    lock = threading.Lock()
+
+    def __init__(self, launch_seconds, crash_after=None):
+        time.sleep(launch_seconds)
+        self.crash_after = crash_after
+        self.pages = 0
+        self.page_source = ''
+        with FakeDriver.lock:
+            FakeDriver.alive += 1
+
+    def get(self, url):
+        with urllib.request.urlopen(url) as response:
+            self.page_source = response.read().decode()
+        self.pages += 1
+
+    def execute_script(self, script):
+        if self.crash_after is not None and self.pages >= self.crash_after:
+            raise RuntimeError("browser crashed")
+        return 1
+
+    def quit(self):
+        with FakeDriver.lock:
+            FakeDriver.alive -= 1
+
+
+def run(searches, threads, search):
+    """Seconds to run `searches` calls of search(i) on `threads` threads"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(search, range(searches)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--searches', type=int, default=40)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--launch-ms', type=float, default=800)
+    args = parser.parse_args()
+
+    server = ThreadingServer(('127.0.0.1', 0), StaticHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/s?k=jeans'
+    launch = args.launch_ms / 1000.0
+
+    def per_call(_):
+        # The previous behaviour: launch, load, quit
+        driver = FakeDriver(launch)
+        try:
+            driver.get(url)
+        finally:
+            driver.quit()
+
+    pool = BrowserPool(lambda: FakeDriver(launch), max_size=args.threads, max_pages=0)
+
+    def pooled(_):
+        with pool.driver() as driver:
+            driver.get(url)
+
+    per_call_seconds = run(args.searches, args.threads, per_call)
+    pooled_seconds = run(args.searches, args.threads, pooled)
+    print(f"{args.searches} searches on {args.threads} threads, {args.launch_ms:.0f} ms browser launch")
+    print(f"  browser per call  {per_call_seconds:7.2f} s")
+    print(f"  browser pool      {pooled_seconds:7.2f} s   {per_call_seconds / pooled_seconds:5.1f}x   {pool.stats()}")
+    pool.close()
+    print(f"  drivers alive after close: {FakeDriver.alive}")
+
+    # Guarantees, with instant launches; every third browser crashes after two pages
+    launches = iter(range(10 ** 6))
+    pool = BrowserPool(
+        lambda: FakeDriver(0, crash_after=2 if next(launches) % 3 == 0 else None),
+        max_size=2, max_pages=5, checkout_timeout=5
+    )
+
+    def flaky(i):
+        try:
+            with pool.driver() as driver:
+                driver.get(url)
+                if i % 3 == 0:
+                    raise ValueError("parse failure")
+        except ValueError:
+            pass
+
+    run(60, 4, flaky)
+    stats = pool.stats()
+    pool.close()
+    print(f"\nrecycling / failures: {stats}")
+    print(f"  drivers alive after close: {FakeDriver.alive}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bounded-cost dominant color extraction vs full-image KMeans
+
+The synthetic "garment" images are a few flat color regions plus noise, so
+the dominant colors are known. Peak memory is measured with tracemalloc.
+
+Usage:
+    python benchmarks/bench_colors.py [--megapixels 0.3 2 12] [--legacy-max 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from sklearn.cluster import KMeans
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from color_extractor import DominantColorExtractor
+
+
+def make_image(megapixels, rng):
+    """Synthetic RGB image made of four color bands with sensor-like noise"""
+    height = int(np.sqrt(megapixels * 1e6 * 3 / 4))
+    width = int(height * 4 / 3)
+    palette = np.array([[20, 30, 90], [230, 230, 225], [140, 20, 30], [60, 60, 60]], dtype=np.int16)
+    bands = np.repeat(np.arange(4), int(np.ceil(height / 4)))[:height]
+    image = palette[bands][:, None, :].repeat(width, axis=1)
+    image += rng.integers(-8, 9, size=image.shape, dtype=np.int16)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def legacy_extract(rgb_image):
+    """The previous implementation: unique + KMeans over every pixel"""
+    pixels = rgb_image.reshape(-1, 3)
+    kmeans = KMeans(n_clusters=min(5, len(np.unique(pixels, axis=0))), random_state=42)
+    kmeans.fit(pixels)
+    return kmeans.cluster_centers_.astype(int)
+
+
+def measure(func):
+    """Return (result, seconds, peak MB) for a single call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megapixels', type=float, nargs='+', default=[0.3, 2, 12])
+    parser.add_argument('--legacy-max', type=float, default=2,
+                        help='skip the legacy implementation above this many megapixels')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    extractor = DominantColorExtractor()
+
+    print(f"{'MP':>5} {'impl':>8} {'time (s)':>9} {'peak MB':>8}  colors")
+    for megapixels in args.megapixels:
+        image = make_image(megapixels, rng)
+
+        colors, elapsed, peak = measure(lambda: extractor.extract(image))
+        print(f"{megapixels:>5} {'budget':>8} {elapsed:>9.3f} {peak:>8.1f}  {colors.tolist()}")
+
+        if megapixels <= args.legacy_max:
+            colors, elapsed, peak = measure(lambda: legacy_extract(image))
+            print(f"{megapixels:>5} {'legacy':>8} {elapsed:>9.3f} {peak:>8.1f}  {colors.tolist()}")
+
+
+if __name__ == '__main__':
+    main()
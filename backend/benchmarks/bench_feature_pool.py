@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: feature stages in the request thread vs in a process pool
+
+Analyzes synthetic JPEG uploads from several threads, as concurrent
+requests would, with the color, style and texture stages run inline and
+then in FeatureStagePool workers. Classification uses the heuristic
+fallback so no model is needed. Results of both runs must be identical.
+
+Usage:
+    python benchmarks/bench_feature_pool.py [--images 32] [--threads 4] [--workers 4] [--megapixels 2]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clothing_analyzer import ClothingAnalyzer
+
+
+def make_upload(megapixels, rng):
+    """JPEG bytes of a noisy striped garment-like image"""
+    height = int(np.sqrt(megapixels * 1e6 * 3 / 4))
+    width = int(height * 4 / 3)
+    palette = rng.integers(0, 256, size=(4, 3)).astype(np.int16)
+    bands = (np.arange(height) // max(1, height // 12)) % 4
+    image = palette[bands][:, None, :].repeat(width, axis=1)
+    image += rng.integers(-12, 13, size=image.shape, dtype=np.int16)
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(image, 0, 255).astype(np.uint8)).save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def run(analyzer, uploads, threads):
+    """(results, seconds) for analyzing every upload on `threads` threads"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(analyzer.analyze_bytes, uploads))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--megapixels', type=float, default=2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    uploads = [make_upload(args.megapixels, rng) for _ in range(args.images)]
+    analyzer = ClothingAnalyzer(load_model=False)
+    analyzer.analyze_bytes(uploads[0])  # warm imports and caches
+
+    inline, inline_seconds = run(analyzer, uploads, args.threads)
+
+    analyzer.enable_process_pool(args.workers)
+    pooled, pooled_seconds = run(analyzer, uploads, args.threads)
+    stats = analyzer.feature_pool.stats()
+    analyzer.feature_pool.close()
+
+    identical = json.dumps(inline, sort_keys=True) == json.dumps(pooled, sort_keys=True)
+    print(f"{args.images} images of {args.megapixels} MP on {args.threads} threads, {os.cpu_count()} CPUs")
+    print(f"  inline stages         {inline_seconds:7.2f} s   {args.images / inline_seconds:6.1f} img/s")
+    print(f"  {args.workers} worker processes    {pooled_seconds:7.2f} s   {args.images / pooled_seconds:6.1f} img/s"
+          f"   {inline_seconds / pooled_seconds:4.1f}x")
+    print(f"  identical results: {identical}   {stats}")
+
+
+if __name__ == '__main__':
+    main()
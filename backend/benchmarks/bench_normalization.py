@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Report: analysis accuracy and latency with downscale-first normalization
+
+Analyzes every image at full resolution (ANALYSIS_MAX_SIDE=0) and with the
+longest side capped at each --max-side value. For each cap it prints the
+median end-to-end latency (decode included) and how often each field of
+the `analysis` result matches the full-resolution one. Classification uses
+the heuristic fallback unless --model is given, so by default no torch is
+needed.
+
+Usage:
+    python benchmarks/bench_normalization.py --fixtures path/to/photos [--max-side 512 1024 2048]
+    python benchmarks/bench_normalization.py --synthetic 12 --megapixels 12
+"""
+
+import argparse
+import glob
+import io
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clothing_analyzer import ClothingAnalyzer
+
+IMAGE_PATTERNS = ('*.jpg', '*.jpeg', '*.png', '*.webp', '*.bmp')
+
+# Categorical analysis fields compared for exact agreement
+FIELDS = {
+    'clothing_type': lambda r: r['clothing_type'],
+    'top color': lambda r: r['dominant_colors'][0]['name'],
+    'color names': lambda r: sorted({c['name'] for c in r['dominant_colors']}),
+    'has_patterns': lambda r: r['style_attributes']['has_patterns'],
+    'complexity': lambda r: r['style_attributes']['complexity'],
+    'pattern': lambda r: r['texture']['pattern'],
+    'material': lambda r: r['texture']['material'],
+    'formality_level': lambda r: r['formality_level'],
+    'season_suitability': lambda r: r['season_suitability']
+}
+
+
+def synthetic_uploads(count, megapixels, rng):
+    """JPEG bytes of large garment-like photos: shaded fabric with stripes, seams and noise"""
+    uploads = []
+    for _ in range(count):
+        height = int(np.sqrt(megapixels * 1e6 * 3 / 4))
+        width = int(height * 4 / 3)
+        if rng.random() < 0.5:
+            height, width = width, height
+        base = rng.integers(20, 236, size=3).astype(np.float32)
+        accent = rng.integers(0, 256, size=3).astype(np.float32)
+        y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+        shading = 0.8 + 0.2 * np.sin(x / width * np.pi)[..., None]
+        period = rng.integers(20, 200)
+        stripes = ((y // period) % 2 == 0)[..., None] if rng.random() < 0.5 else np.zeros((height, width, 1), bool)
+        image = np.where(stripes, accent, base) * shading
+        image += rng.normal(0, 6, size=image.shape)
+        buffer = io.BytesIO()
+        Image.fromarray(np.clip(image, 0, 255).astype(np.uint8)).save(buffer, format='JPEG', quality=90)
+        uploads.append(buffer.getvalue())
+    return uploads
+
+
+def load_uploads(args):
+    """Encoded fixture images (bytes)"""
+    if args.fixtures:
+        paths = sorted(p for pattern in IMAGE_PATTERNS for p in glob.glob(os.path.join(args.fixtures, pattern)))
+        if not paths:
+            sys.exit(f"No images found in {args.fixtures}")
+        uploads = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                uploads.append(f.read())
+        return uploads
+    return synthetic_uploads(args.synthetic, args.megapixels, np.random.default_rng(0))
+
+
+def run(analyzer, uploads):
+    """(results, latencies) for analyzing every upload"""
+    analyzer.analyze_bytes(uploads[0])  # warm-up
+
+    results, latencies = [], []
+    for data in uploads:
+        start = time.perf_counter()
+        results.append(analyzer.analyze_bytes(data))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help='directory of clothing photos')
+    parser.add_argument('--synthetic', type=int, default=12, help='synthetic photos to use without --fixtures')
+    parser.add_argument('--megapixels', type=float, default=12, help='size of the synthetic photos')
+    parser.add_argument('--max-side', type=int, nargs='+', default=[512, 1024, 2048])
+    parser.add_argument('--model', action='store_true', help='classify with the ViT model (needs torch)')
+    args = parser.parse_args()
+
+    uploads = load_uploads(args)
+
+    def analyzer(max_side):
+        return ClothingAnalyzer(load_model=args.model, max_side=max_side)
+
+    reference, reference_latency = run(analyzer(0), uploads)
+    reference_median = statistics.median(reference_latency) * 1000
+    uniformity = [r['texture']['uniformity_score'] for r in reference]
+
+    print(f"images: {len(uploads)}   full resolution median latency: {reference_median:.1f} ms\n")
+    print(f"{'max side':>10} {'latency':>10} {'speedup':>8}  " + "  ".join(f"{name:>12}" for name in FIELDS)
+          + f"  {'uniformity':>10}")
+
+    for max_side in args.max_side:
+        results, latencies = run(analyzer(max_side), uploads)
+        median = statistics.median(latencies) * 1000
+        agreement = [
+            sum(field(a) == field(b) for a, b in zip(reference, results)) / len(uploads)
+            for field in FIELDS.values()
+        ]
+        drift = statistics.mean(abs(r['texture']['uniformity_score'] - u) for r, u in zip(results, uniformity))
+        print(f"{max_side:>10} {median:>8.1f}ms {reference_median / median:>7.1f}x  "
+              + "  ".join(f"{value:>12.0%}" for value in agreement) + f"  {drift:>10.2f}")
+
+    print("\nField columns: share of images whose value matches full resolution."
+          "\nuniformity: mean absolute change of texture.uniformity_score.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: result page parsing backends vs the original BeautifulSoup code
+
+Parses saved search result pages with every installed backend and the
+previous html.parser + find_all implementation, and checks that each
+backend extracts the same titles as the original code. Save real pages with
+e.g. `curl -A "Mozilla/5.0" "https://www.amazon.com/s?k=jeans" > amazon_jeans.html`;
+files are matched to a site by their name prefix (amazon*, google*). Without
+--fixtures a synthetic ~400 KB Amazon-like page is used.
+
+The `lxml stream` row feeds the page to LxmlResultParser.parse_stream() in
+SEARCH_STREAM_CHUNK_SIZE chunks, as SEARCH_STREAMING does, and shows the
+share of the page it read before it had enough results. Streaming is only
+worth enabling if the download time saved outweighs its extra parse time.
+
+Usage:
+    python benchmarks/bench_parsers.py [--fixtures <dir>] [--repeat 20]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from html_parsers import available_backends, create_parser
+from web_searcher import WebSearcher
+
+LIMITS = {'amazon': 10, 'google_shopping': 5}
+
+
+def synthetic_amazon_page(results=48, padding_kb=400):
+    """Result containers surrounded by the kind of markup real pages carry"""
+    items = ''.join(
+        f'<div data-component-type="s-search-result" data-asin="B0{i:08d}"><div class="s-card">'
+        f'<h2><a class="a-link-normal" href="/dp/B0{i:08d}"><span>Slim Fit Denim Jeans {i} Dark Blue</span></a></h2>'
+        f'<span class="a-price"><span class="a-price-whole">{20 + i}</span></span>'
+        f'<img class="s-image" src="https://m.media-amazon.com/images/I/{i}.jpg"/>'
+        f'<span class="a-icon-alt">4.{i % 10} out of 5 stars</span></div></div>'
+        for i in range(results)
+    )
+    filler = '<div class="nav"><ul>' + '<li><a href="/x">Menu entry</a></li>' * (padding_kb * 1024 // 40) + '</ul></div>'
+    return f'<html><head><title>Amazon.com : jeans</title></head><body>{filler}{items}</body></html>'.encode()
+
+
+def legacy_titles(site, html):
+    """Titles as extracted by the original BeautifulSoup code"""
+    soup = BeautifulSoup(html, 'html.parser')
+    titles = []
+    if site == 'amazon':
+        for container in soup.find_all('div', {'data-component-type': 's-search-result'})[:LIMITS[site]]:
+            title_elem = container.find('h2')
+            if not title_elem:
+                continue
+            title_link = title_elem.find('a')
+            titles.append(title_link.find('span').get_text(strip=True) if title_link and title_link.find('span') else 'N/A')
+    else:
+        for result in soup.find_all('div', class_='sh-dgr__content')[:LIMITS[site]]:
+            title_elem = result.find('h3')
+            result.find('span', string=re.compile(r'\$\d+'))
+            titles.append(title_elem.get_text(strip=True) if title_elem else 'N/A')
+    return titles
+
+
+def load_fixtures(directory):
+    """(name, site, html) for every fixture with a recognised prefix"""
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.htm*'))):
+        name = os.path.basename(path)
+        site = 'amazon' if name.startswith('amazon') else 'google_shopping' if name.startswith('google') else None
+        if site is None:
+            print(f"skipping {name}: name should start with amazon or google")
+            continue
+        with open(path, 'rb') as f:
+            fixtures.append((name, site, f.read()))
+    return fixtures
+
+
+def time_call(func, repeat):
+    """Best-of-repeat seconds for one call"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help='directory of saved result pages')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        fixtures = [('synthetic_amazon', 'amazon', synthetic_amazon_page())]
+    if not fixtures:
+        sys.exit("No fixtures found")
+
+    sites = WebSearcher(max_workers=1)
+    backends = available_backends()
+    print(f"backends: {', '.join(backends)}\n")
+
+    for name, site, html in fixtures:
+        print(f"{name} ({site}, {len(html) / 1024:.0f} KB)")
+        expected, legacy_seconds = time_call(lambda: legacy_titles(site, html), args.repeat)
+        print(f"  {'legacy bs4':<12} {legacy_seconds * 1000:8.2f} ms   {len(expected)} results")
+
+        info = sites.shopping_sites[site]
+        for backend in backends:
+            page_parser = create_parser(info['selectors'], backend, info.get('text_patterns'))
+            rows, seconds = time_call(lambda: page_parser.parse(html, limit=LIMITS[site]), args.repeat)
+            titles = [row['title'] or 'N/A' for row in rows if site != 'amazon' or row['title']]
+            agree = 'same titles' if titles == expected else 'TITLES DIFFER'
+            print(f"  {backend:<12} {seconds * 1000:8.2f} ms   {legacy_seconds / seconds:5.1f}x   {agree}")
+
+        if 'lxml' in backends:
+            stream_parser = create_parser(info['selectors'], 'lxml', info.get('text_patterns'))
+            read = [0]
+
+            def chunks():
+                read[0] = 0
+                for start in range(0, len(html), Config.SEARCH_STREAM_CHUNK_SIZE):
+                    chunk = html[start:start + Config.SEARCH_STREAM_CHUNK_SIZE]
+                    read[0] += len(chunk)
+                    yield chunk
+
+            rows, seconds = time_call(lambda: stream_parser.parse_stream(chunks(), limit=LIMITS[site]), args.repeat)
+            titles = [row['title'] or 'N/A' for row in rows if site != 'amazon' or row['title']]
+            agree = 'same titles' if titles == expected else 'TITLES DIFFER'
+            print(f"  {'lxml stream':<12} {seconds * 1000:8.2f} ms   {legacy_seconds / seconds:5.1f}x   {agree}"
+                  f"   read {read[0] / len(html):.0%} of the page")
+        print()
+
+    sites.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fp32 vs dynamic-int8 ViT inference on CPU
+
+Reports median per-image latency for both models and how often the int8
+model agrees with fp32 on the top-1 label and on the mapped clothing type.
+Needs the full requirements (torch + transformers) and the model weights in
+MODEL_CACHE_DIR (or network access to download them).
+
+Usage:
+    python benchmarks/bench_quantization.py --fixtures path/to/images [--threads 4]
+    python benchmarks/bench_quantization.py --synthetic 16
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clothing_analyzer import ClothingAnalyzer
+
+IMAGE_PATTERNS = ('*.jpg', '*.jpeg', '*.png', '*.webp', '*.bmp')
+
+
+def load_fixtures(args):
+    """Fixture images as RGB PIL images"""
+    if args.fixtures:
+        paths = sorted(p for pattern in IMAGE_PATTERNS for p in glob.glob(os.path.join(args.fixtures, pattern)))
+        if not paths:
+            sys.exit(f"No images found in {args.fixtures}")
+        return [Image.open(path).convert('RGB') for path in paths]
+
+    rng = np.random.default_rng(0)
+    return [Image.fromarray(rng.integers(0, 256, size=(480, 360, 3), dtype=np.uint8)) for _ in range(args.synthetic)]
+
+
+def run(analyzer, images):
+    """(latencies, top-1 labels, clothing types) for every image"""
+    analyzer._infer(images[0])  # warm-up
+
+    latencies, labels, types = [], [], []
+    for image in images:
+        start = time.perf_counter()
+        results = analyzer._infer(image)
+        latencies.append(time.perf_counter() - start)
+        labels.append(results[0]['label'])
+        types.append(analyzer._map_classification(results, image))
+    return latencies, labels, types
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help='directory of clothing photos')
+    parser.add_argument('--synthetic', type=int, default=16, help='random images to use without --fixtures')
+    parser.add_argument('--threads', type=int, default=0, help='torch CPU threads (0 = default)')
+    args = parser.parse_args()
+
+    images = load_fixtures(args)
+
+    fp32 = ClothingAnalyzer(use_gpu=False, quantize=False, num_threads=args.threads)
+    int8 = ClothingAnalyzer(use_gpu=False, quantize=True, num_threads=args.threads)
+
+    fp32_latency, fp32_labels, fp32_types = run(fp32, images)
+    int8_latency, int8_labels, int8_types = run(int8, images)
+
+    fp32_median = statistics.median(fp32_latency) * 1000
+    int8_median = statistics.median(int8_latency) * 1000
+    label_agreement = sum(a == b for a, b in zip(fp32_labels, int8_labels)) / len(images)
+    type_agreement = sum(a == b for a, b in zip(fp32_types, int8_types)) / len(images)
+
+    print(f"images:                {len(images)}")
+    print(f"fp32 median latency:   {fp32_median:.1f} ms")
+    print(f"int8 median latency:   {int8_median:.1f} ms ({fp32_median / int8_median:.2f}x)")
+    print(f"top-1 label agreement: {label_agreement:.1%}")
+    print(f"clothing type agreement: {type_agreement:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled relevance scorer vs per-phrase substring scans
+
+Scores N product titles against M recommendations, first with the
+original WebSearcher relevance scoring (one `in` scan per phrase, one
+title and recommendation at a time) and then with one RelevanceScorer for all M
+recommendations. The compiled scores are checked against a reference
+scorer that searches each phrase separately with its own whole-word regex
+(item types with an optional plural suffix); any difference is printed and
+the script exits non-zero. Also reports how many scores differ from the
+substring scoring because phrases now only match whole words.
+
+Usage:
+    python benchmarks/bench_relevance.py [--titles 2000] [--recommendations 10]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relevance import FORMALITY_WORDS, PLURAL_SUFFIX, RelevanceScorer
+from style_matcher import StyleMatcher
+
+WORDS = ['slim', 'fit', 'classic', 'cotton', 'stretch', 'tailored', 'relaxed', 'business', 'casual', 'premium',
+         'blue', 'navy', 'red', 'white', 'black', 'gray', 'jeans', 'pants', 'shirt', 't-shirt', 'sweatpants',
+         'blazer', 'dress', 'comfortable', 'everyday', 'men', 'women', 'denim', 'oxford', 'smart-casual',
+         'shirts', 't-shirts', 'blazers', 'dresses', 'redress', 'shirtsleeve', 'polos', 'chinos']
+
+
+def substring_relevance(title, recommendation):
+    """The original scoring: lower-case the title and scan it once per phrase"""
+    score = 0.0
+    title_lower = title.lower()
+    item_type = recommendation.get('item_type', '').lower()
+    if item_type in title_lower:
+        score += 1.0
+    for color in recommendation.get('recommended_colors', []):
+        if color.lower() in title_lower:
+            score += 0.5
+    for tag in recommendation.get('style_tags', []):
+        if tag.lower() in title_lower:
+            score += 0.3
+    formality = recommendation.get('formality_level', '').lower()
+    if formality == 'formal' and any(word in title_lower for word in ['business', 'formal', 'dress', 'professional']):
+        score += 0.4
+    elif formality == 'casual' and any(word in title_lower for word in ['casual', 'comfortable', 'relaxed']):
+        score += 0.4
+    return score
+
+
+def whole_word_relevance(title, recommendation):
+    """Reference scoring: one whole-word regex search per phrase"""
+    def found(phrase, suffix=''):
+        return re.search(r'\b' + re.escape(phrase.lower()) + suffix + r'\b', title.lower()) is not None
+
+    score = 0.0
+    item_type = recommendation.get('item_type', '')
+    if item_type and found(item_type, PLURAL_SUFFIX):
+        score += 1.0
+    for color in recommendation.get('recommended_colors', []):
+        if color and found(color):
+            score += 0.5
+    for tag in recommendation.get('style_tags', []):
+        if tag and found(tag):
+            score += 0.3
+    words = FORMALITY_WORDS.get(recommendation.get('formality_level', '').lower(), ())
+    if any(found(word) for word in words):
+        score += 0.4
+    return score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--recommendations', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    titles = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 10))).title() for _ in range(args.titles)]
+    matcher = StyleMatcher(cache_size=0)
+    per_analysis = [
+        matcher.find_matches({
+            'clothing_type': clothing_type, 'formality_level': formality,
+            'dominant_colors': [{'name': 'blue'}, {'name': 'red'}]
+        })
+        for clothing_type, formality in [('shirt', 'casual'), ('jeans', 'casual'), ('blazer', 'formal'),
+                                         ('polo', 'semi-formal'), ('pants', 'formal'), ('skirt', 'casual')]
+    ]
+    # Interleave, so even a few recommendations cover several item types
+    recommendations = [rec for group in itertools.zip_longest(*per_analysis) for rec in group if rec]
+    recommendations = recommendations[:args.recommendations]
+
+    start = time.perf_counter()
+    legacy = [[substring_relevance(title, rec) for rec in recommendations] for title in titles]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = RelevanceScorer(recommendations).score_titles(titles)
+    compiled_seconds = time.perf_counter() - start
+
+    reference = [[whole_word_relevance(title, rec) for rec in recommendations] for title in titles]
+    mismatches = [
+        (title, rec.get('item_type'), expected, actual)
+        for title, reference_row, row in zip(titles, reference, compiled)
+        for rec, expected, actual in zip(recommendations, reference_row, row)
+        if abs(expected - actual) > 1e-9
+    ]
+
+    changed = sum(a != b for legacy_row, row in zip(legacy, compiled) for a, b in zip(legacy_row, row))
+    total = len(titles) * len(recommendations)
+    print(f"{len(titles)} titles x {len(recommendations)} recommendations")
+    print(f"  substring scans    {legacy_seconds * 1000:8.1f} ms")
+    print(f"  compiled scorer    {compiled_seconds * 1000:8.1f} ms   {legacy_seconds / compiled_seconds:4.1f}x")
+    print(f"  scores changed by whole-word matching: {changed} of {total} ({changed / total:.1%})")
+    print(f"  parity with the whole-word reference: {total - len(mismatches)} of {total} scores equal")
+    for title, item_type, expected, actual in mismatches[:10]:
+        print(f"    {title!r} vs {item_type!r}: reference {expected:.1f}, compiled {actual:.1f}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
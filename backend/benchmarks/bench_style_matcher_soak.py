@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Soak test: StyleMatcher latency and memory over many calls on one instance
+
+The server keeps a single StyleMatcher for its whole life, so per-call cost
+and memory must not depend on how many requests came before. This calls
+find_matches() repeatedly with rotating analyses and prints, per window,
+the mean latency and the process RSS; both should stay flat.
+
+For comparison, --legacy-calls runs the original _get_complementary_types,
+which extended the shared rule lists on every call, on a fresh instance.
+
+Usage:
+    python benchmarks/bench_style_matcher_soak.py [--calls 1000000] [--windows 10] [--legacy-calls 20000] [--cache-size 0]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from style_matcher import StyleMatcher
+
+ANALYSES = [
+    {'clothing_type': clothing_type, 'formality_level': formality,
+     'dominant_colors': [{'name': color}, {'name': 'white'}], 'season_suitability': ['spring', 'fall']}
+    for clothing_type, formality, color in [
+        ('shirt', 'formal', 'blue'), ('jeans', 'casual', 'navy'), ('dress', 'formal', 'black'),
+        ('t-shirt', 'casual', 'red'), ('polo', 'semi-formal', 'green'), ('hoodie', 'casual', 'gray'),
+        ('blazer', 'formal', 'brown'), ('skirt', 'semi-formal', 'pink'), ('jacket', 'casual', 'purple')
+    ]
+]
+
+
+class LegacyStyleMatcher(StyleMatcher):
+    """StyleMatcher with the original rule lookup, which mutated its rule lists"""
+
+    def __init__(self):
+        super().__init__(cache_size=0)
+        self.style_rules = self._load_style_rules()
+
+    def _get_complementary_types(self, clothing_type, formality):
+        rules = self.style_rules.get(formality, {})
+        complementary = rules.get(clothing_type, [])
+        if self._is_top(clothing_type):
+            complementary.extend(["pants", "jeans", "skirt", "shorts"])
+        elif self._is_bottom(clothing_type):
+            complementary.extend(["shirt", "t-shirt", "blouse", "sweater"])
+        elif self._is_outerwear(clothing_type):
+            complementary.extend(["shirt", "pants", "dress"])
+        complementary = list(set(complementary))
+        if clothing_type in complementary:
+            complementary.remove(clothing_type)
+        return complementary
+
+
+def rss_mb():
+    """Current resident set size in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        # No procfs (e.g. macOS): fall back to the peak RSS
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def soak(matcher, calls, windows):
+    """Print mean latency and RSS for each of `windows` equal slices of `calls`"""
+    per_window = max(1, calls // windows)
+    rule_items = lambda: sum(len(items) for rules in matcher.style_rules.values() for items in rules.values())
+    print(f"{'calls':>10} {'mean us':>9} {'RSS MB':>8} {'rule items':>11}")
+    for window in range(windows):
+        start = time.perf_counter()
+        for i in range(per_window):
+            matcher.find_matches(ANALYSES[i % len(ANALYSES)])
+        elapsed = time.perf_counter() - start
+        print(f"{(window + 1) * per_window:>10} {elapsed / per_window * 1e6:>9.1f} {rss_mb():>8.1f} {rule_items():>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=1000000)
+    parser.add_argument('--windows', type=int, default=10)
+    parser.add_argument('--legacy-calls', type=int, default=20000, help='0 skips the legacy comparison')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help='memoized results; 0 runs the full recommendation build on every call')
+    args = parser.parse_args()
+
+    print(f"StyleMatcher (compiled rule tables, cache_size={args.cache_size})")
+    soak(StyleMatcher(cache_size=args.cache_size), args.calls, args.windows)
+
+    if args.legacy_calls:
+        print("\noriginal rule lookup (mutating)")
+        soak(LegacyStyleMatcher(), args.legacy_calls, args.windows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+# Resources a scraper never needs; blocking them cuts page load time
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.css', '*.woff', '*.woff2', '*.ttf', '*.mp4', '*.webm'
+]
+
+
+def chrome_driver_factory(user_agent: str = None, page_load_timeout: float = 30,
+                          block_resources: bool = True) -> Callable[[], Any]:
+    """
+    Factory for headless Chrome drivers configured for scraping
+
+    Args:
+        user_agent: User-Agent header for the browser
+        page_load_timeout: Seconds before driver.get() gives up
+        block_resources: Skip images, stylesheets, fonts and media
+
+    Returns:
+        Zero-argument callable returning a new webdriver.Chrome
+    """
+    def create():
+        # Selenium is only needed when a browser is actually launched
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        if user_agent:
+            chrome_options.add_argument(f'--user-agent={user_agent}')
+        if block_resources:
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+            chrome_options.add_experimental_option('prefs', {
+                'profile.managed_default_content_settings.images': 2,
+                'profile.managed_default_content_settings.stylesheets': 2,
+                'profile.managed_default_content_settings.fonts': 2
+            })
+            # Return from get() once the DOM is ready rather than after every subresource
+            chrome_options.page_load_strategy = 'eager'
+
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.set_page_load_timeout(page_load_timeout)
+        if block_resources:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        return driver
+
+    return create
+
+
+class BrowserPool:
+    """
+    Bounded pool of warm browser drivers
+
+    Launching a browser costs seconds and hundreds of MB, so drivers are
+    kept alive between searches. At most `max_size` exist at once; callers
+    beyond that wait for a checkin. A driver is health-checked when it is
+    checked out and after a failed use, recycled after `max_pages` uses,
+    and always quit when discarded, when the pool closes or at interpreter
+    exit. Drivers are created by `driver_factory`, so any object with
+    `quit()` and `execute_script()` can stand in for a real browser.
+    """
+
+    def __init__(self, driver_factory: Callable[[], Any], max_size: int = 2, max_pages: int = 50,
+                 checkout_timeout: float = 30):
+        """
+        Args:
+            driver_factory: Zero-argument callable creating a new driver
+            max_size: Most drivers alive at once
+            max_pages: Uses after which a driver is quit and replaced
+                (0 never recycles)
+            checkout_timeout: Default seconds to wait for a free driver
+        """
+        self.driver_factory = driver_factory
+        self.max_size = max(1, max_size)
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+
+        self._condition = threading.Condition()
+        self._closed = False
+        self._reset()
+
+        # Counters for monitoring
+        self.launched = 0
+        self.recycled = 0
+        self.discarded = 0
+        self.checkouts = 0
+
+        atexit.register(self.close)
+
+    def _reset(self):
+        """Start with no drivers in the current process"""
+        self._pid = os.getpid()
+        self._idle = deque()  # drivers ready for use, most recently used last
+        self._pages = {}  # id(driver) -> uses so far
+        self._live = 0  # idle + checked out + being launched
+
+    @contextmanager
+    def driver(self, timeout: float = None):
+        """
+        Check out a driver for the duration of a with-block
+
+        The driver is checked back in however the block exits; if the
+        block raised, it is health-checked before being reused.
+        """
+        driver = self.checkout(timeout)
+        failed = False
+        try:
+            yield driver
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.checkin(driver, failed=failed)
+
+    def checkout(self, timeout: float = None) -> Any:
+        """
+        Take a healthy driver from the pool, launching one if there is room
+
+        Args:
+            timeout: Seconds to wait for a free driver (default checkout_timeout)
+
+        Returns:
+            A driver that must be passed back to checkin()
+
+        Raises:
+            TimeoutError: If every driver stayed busy for `timeout` seconds
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._condition:
+                self._check_process()
+                if self._closed:
+                    raise RuntimeError("BrowserPool is closed")
+
+                while not self._idle and self._live >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        raise TimeoutError(f"No browser became available within {timeout} seconds")
+                    if self._closed:
+                        raise RuntimeError("BrowserPool is closed")
+
+                driver = self._idle.pop() if self._idle else None
+                if driver is None:
+                    self._live += 1
+
+            if driver is None:
+                driver = self._launch()
+            elif not self._healthy(driver):
+                self._discard(driver)
+                continue
+
+            with self._condition:
+                self.checkouts += 1
+            return driver
+
+    def checkin(self, driver: Any, failed: bool = False):
+        """
+        Return a driver to the pool
+
+        Args:
+            driver: Driver obtained from checkout()
+            failed: The caller hit an error while using it; the driver is
+                kept only if it still passes a health check
+        """
+        with self._condition:
+            if self._pid != os.getpid():
+                # Driver belongs to the parent process; leave it alone
+                return
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            worn_out = self.max_pages > 0 and self._pages[id(driver)] >= self.max_pages
+            closed = self._closed
+
+        if closed or worn_out or (failed and not self._healthy(driver)):
+            if worn_out:
+                with self._condition:
+                    self.recycled += 1
+            self._discard(driver)
+            return
+
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    def close(self):
+        """Quit every idle driver; drivers still checked out are quit at checkin"""
+        with self._condition:
+            if self._pid != os.getpid():
+                return
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for driver in idle:
+            self._discard(driver)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and lifecycle counters"""
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "live": self._live,
+                "idle": len(self._idle),
+                "launched": self.launched,
+                "recycled": self.recycled,
+                "discarded": self.discarded,
+                "checkouts": self.checkouts
+            }
+
+    def _check_process(self):
+        """Forget drivers inherited across fork() (caller holds _condition)"""
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _launch(self):
+        """Create a driver for a slot already reserved in _live"""
+        try:
+            driver = self.driver_factory()
+        except BaseException:
+            with self._condition:
+                self._live -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self.launched += 1
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _healthy(self, driver) -> bool:
+        """Whether the browser behind a driver still responds"""
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        """Quit a driver and free its slot"""
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error quitting browser: {e}")
+
+        with self._condition:
+            self._pages.pop(id(driver), None)
+            self._live -= 1
+            self.discarded += 1
+            self._condition.notify()
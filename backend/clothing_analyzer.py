@@ -1,28 +1,241 @@
 import cv2
 import numpy as np
-from PIL import Image
-import torch
-import torchvision.transforms as transforms
-from transformers import pipeline
-import colorsys
-from sklearn.cluster import KMeans
+import io
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from texture_features import local_binary_pattern
+from color_extractor import DominantColorExtractor
+from image_context import DecodedImage
+from batching import MicroBatcher
+from feature_pool import FeatureStagePool
+from analysis_cache import AnalysisCache, content_hash
+from process_local import ProcessLocal
+from config import Config
 
 class ClothingAnalyzer:
-    def __init__(self):
-        """Initialize the clothing analyzer with AI models"""
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    # Bump whenever analysis logic changes so cached results are invalidated
+    ANALYZER_VERSION = "2"
+    MODEL_NAME = "google/vit-base-patch16-224"
+    
+    # Map model outputs to clothing categories
+    CLOTHING_MAPPING = {
+        'suit': 'suit',
+        'dress': 'dress',
+        'shirt': 'shirt',
+        'blouse': 'blouse',
+        'sweater': 'sweater',
+        'jacket': 'jacket',
+        'coat': 'outerwear',
+        'pants': 'pants',
+        'jeans': 'jeans',
+        'skirt': 'skirt',
+        'shorts': 'shorts',
+        't-shirt': 't-shirt',
+        'polo': 'polo',
+        'hoodie': 'hoodie',
+        'cardigan': 'cardigan',
+        'blazer': 'blazer'
+    }
+    
+    def __init__(self, load_model=True, model_load_timeout=None, use_gpu=None, model_cache_dir=None,
+                 offline=None, quantize=None, num_threads=None, max_side=None):
+        """
+        Initialize the clothing analyzer with AI models
+        
+        Model settings default to the matching Config values.
+        
+        Args:
+            load_model (bool): Load the classifier now. Pass False to defer it
+                to load_model_async() or to the first classification.
+            model_load_timeout (float): Seconds a classification waits for a
+                model that is still loading before using the fallback
+            use_gpu (bool): Run on CUDA when it is available
+            model_cache_dir (str): Where model weights are cached
+            offline (bool): Only load weights already in model_cache_dir
+            quantize (bool): On CPU, quantize the ViT linear layers to int8
+            num_threads (int): Pin torch's CPU thread count (0 keeps the default)
+            max_side (int): Longest image side analyzed, in pixels; larger
+                uploads are downscaled while decoding (0 keeps full resolution)
+        """
+        self.use_gpu = Config.USE_GPU if use_gpu is None else use_gpu
+        self.model_cache_dir = Config.MODEL_CACHE_DIR if model_cache_dir is None else model_cache_dir
+        self.offline = Config.MODEL_OFFLINE if offline is None else offline
+        self.quantize = Config.MODEL_QUANTIZE if quantize is None else quantize
+        self.num_threads = Config.TORCH_NUM_THREADS if num_threads is None else num_threads
+        
+        # The image classification pipeline is built by load_model(); torch
+        # and transformers are only imported there
+        self.device = None
+        self.quantized = False
+        self.classifier = None
+        self.model_state = "cold"  # cold -> warming -> ready | failed
+        self.model_error = None
+        self.model_load_timeout = Config.MODEL_LOAD_TIMEOUT if model_load_timeout is None else model_load_timeout
+        self._load_in_background = False  # set by load_model_async(); forked children restart the load
+        self._loader = ProcessLocal(self._new_loader)  # (lock, ready event) of this process
+        self._loader.get()
+        
+        # Batched inference settings
+        self.max_batch_size = 8
+        self.batcher = None
         
-        # Initialize image classification pipeline for clothing detection
-        self.classifier = pipeline(
-            "image-classification",
-            model="google/vit-base-patch16-224",
-            device=0 if torch.cuda.is_available() else -1
-        )
+        # Threads decoding and extracting features for analyze_batch (1 = inline)
+        self.batch_workers = Config.BATCH_DECODE_WORKERS
+        self._batch_pool = None
+        self._batch_pool_pid = None
+        self._batch_pool_lock = threading.Lock()
+        
+        # Optional content-addressed result cache (see enable_cache)
+        self.cache = None
+        
+        # Optional process pool for the feature stages (see enable_process_pool)
+        self.feature_pool = None
         
         # Color extraction settings
         self.color_threshold = 5
+        self.color_extractor = DominantColorExtractor(n_colors=5, pixel_budget=20000, quant_bits=5)
+        
+        # Normalization: every stage works on images at most this many pixels on the longest side
+        self.max_side = Config.ANALYSIS_MAX_SIDE if max_side is None else max_side
+        
+        # Texture (LBP) settings
+        self.texture_size = (100, 100)
+        self.lbp_radius = 1
+        self.lbp_neighbors = 8
+        
+        if load_model:
+            self.load_model()
+        
+    def load_model(self):
+        """
+        Build the image classification pipeline (blocking)
+        
+        Safe to call from several threads; only the first call does the work.
+        A failure is recorded in model_state/model_error and classification
+        falls back to image heuristics.
+        """
+        lock, ready = self._loader.get()
+        with lock:
+            if self.model_state in ("ready", "failed"):
+                return self.model_state == "ready"
+            self.model_state = "warming"
+            
+            try:
+                import torch
+                from transformers import pipeline
+                
+                use_cuda = self.use_gpu and torch.cuda.is_available()
+                self.device = torch.device("cuda" if use_cuda else "cpu")
+                if not use_cuda and self.num_threads > 0:
+                    torch.set_num_threads(self.num_threads)
+                
+                processor, model = self._load_pretrained()
+                model.eval()
+                
+                if self.quantize and not use_cuda:
+                    # Dynamic int8 quantization of the Linear layers, which
+                    # dominate ViT inference time on CPU
+                    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                    self.quantized = True
+                
+                # Initialize image classification pipeline for clothing detection
+                self.classifier = pipeline(
+                    "image-classification",
+                    model=model,
+                    image_processor=processor,
+                    device=0 if use_cuda else -1
+                )
+                self.model_state = "ready"
+            except Exception as e:
+                self.model_state = "failed"
+                self.model_error = str(e)
+                print(f"Error loading classification model: {e}")
+            finally:
+                ready.set()
+            
+            return self.model_state == "ready"
+    
+    def _load_pretrained(self):
+        """Load the image processor and model, from model_cache_dir when possible"""
+        from transformers import AutoImageProcessor, AutoModelForImageClassification
+        
+        os.makedirs(self.model_cache_dir, exist_ok=True)
+        
+        def load(local_files_only):
+            processor = AutoImageProcessor.from_pretrained(
+                self.MODEL_NAME, cache_dir=self.model_cache_dir, local_files_only=local_files_only
+            )
+            model = AutoModelForImageClassification.from_pretrained(
+                self.MODEL_NAME, cache_dir=self.model_cache_dir, local_files_only=local_files_only
+            )
+            return processor, model
+        
+        # Try the local cache first so a warm node never touches the network
+        try:
+            return load(local_files_only=True)
+        except OSError:
+            if self.offline:
+                raise
+            return load(local_files_only=False)
+    
+    def load_model_async(self):
+        """
+        Start loading the model on a background thread and return the thread
+        
+        A process forked while the load is still running (e.g. a gunicorn
+        worker) does not inherit the thread, so it starts its own load.
+        """
+        self._load_in_background = True
+        self._loader.get()
+        if self.model_state == "cold":
+            self.model_state = "warming"
+        thread = threading.Thread(target=self.load_model, name="model-loader", daemon=True)
+        thread.start()
+        return thread
+    
+    def _new_loader(self):
+        """Load lock and ready event for this process, restarting a load the parent had in flight"""
+        lock, ready = threading.Lock(), threading.Event()
+        if self.model_state in ("ready", "failed"):
+            ready.set()
+        elif self.model_state == "warming":
+            # Forked mid-load: the loading thread stayed in the parent
+            if self._load_in_background:
+                threading.Thread(target=self.load_model, name="model-loader", daemon=True).start()
+            else:
+                self.model_state = "cold"
+        return lock, ready
+    
+    def model_status(self):
+        """Model readiness for health checks"""
+        self._loader.get()
+        return {
+            "state": self.model_state,
+            "model": self.MODEL_NAME,
+            "device": str(self.device) if self.device is not None else None,
+            "quantized": self.quantized,
+            "error": self.model_error
+        }
+    
+    def _wait_for_classifier(self):
+        """Return the classifier, loading it or waiting for a background load as needed"""
+        _, ready = self._loader.get()
+        if self.model_state == "cold":
+            self.load_model()
+        ready.wait(self.model_load_timeout)
+        if self.classifier is None:
+            raise RuntimeError(f"Classification model is not available ({self.model_state})")
+        return self.classifier
+    
+    def _infer(self, images, **kwargs):
+        """Run the classifier without autograd bookkeeping"""
+        classifier = self._wait_for_classifier()
         
+        import torch
+        with torch.inference_mode():
+            return classifier(images, **kwargs)
+    
     def analyze_image(self, image_path):
         """
         Analyze a clothing image and extract key features
@@ -33,94 +246,368 @@ class ClothingAnalyzer:
         Returns:
             dict: Analysis results containing clothing type, colors, style, etc.
         """
+        return self._analyze_source(image_path)
+    
+    def analyze_bytes(self, data):
+        """
+        Analyze an encoded image held in memory
+        
+        Args:
+            data (bytes | bytearray | memoryview): Encoded image bytes
+            
+        Returns:
+            dict: Analysis results, as for analyze_image
+        """
+        return self._analyze_source(data)
+    
+    def analyze_stream(self, stream):
+        """
+        Analyze an encoded image from a binary file-like object
+        
+        The stream is decoded in place (e.g. an upload's in-memory or spooled
+        buffer), so nothing has to be written to disk first.
+        
+        Args:
+            stream: Readable, seekable binary stream positioned at the image
+            
+        Returns:
+            dict: Analysis results, as for analyze_image
+        """
+        return self._analyze_source(stream)
+    
+    def analyze_batch(self, images):
+        """
+        Analyze several clothing images, classifying them in batched forward passes
+        
+        Decoding and the per-image feature stages run on `batch_workers`
+        threads; classification runs in chunks of `max_batch_size`.
+        
+        Args:
+            images (list): Image paths, encoded bytes/memoryviews or binary streams
+            
+        Returns:
+            list: One analysis dict per input, in input order. Inputs that
+                cannot be decoded get the usual error result.
+        """
+        results = [None] * len(images)
+        
+        # Cache lookups and decoding run in parallel (PIL and OpenCV release the GIL)
+        pending = []
+        for index, (result, prepared) in enumerate(self._map_batch(self._prepare_source, images)):
+            if prepared is None:
+                results[index] = result
+            else:
+                pending.append((index, prepared))
+        
+        for start in range(0, len(pending), self.max_batch_size):
+            chunk = pending[start:start + self.max_batch_size]
+            classifications = self._classify_batch([prepared[0].pil for _, prepared in chunk])
+            
+            analyses = self._map_batch(
+                self._finish_prepared,
+                [prepared + (classification,) for (_, prepared), classification in zip(chunk, classifications)]
+            )
+            for (index, _), analysis in zip(chunk, analyses):
+                results[index] = analysis
+        
+        return results
+    
+    def _prepare_source(self, source):
+        """(cached or error result, None) or (None, (image, key, phash)) for one batch input"""
         try:
-            # Load and preprocess image
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError("Could not load image")
+            key, cached = self._cache_lookup(source)
+            if cached is not None:
+                return cached, None
             
-            pil_image = Image.open(image_path).convert('RGB')
+            image = self._decode(source)
+            phash, cached = self._cache_lookup_similar(image)
+            if cached is not None:
+                return cached, None
             
-            # Extract clothing type and style
-            clothing_type = self._classify_clothing_type(pil_image)
+            return None, (image, key, phash)
+        except Exception as e:
+            return self._error_result(e), None
+    
+    def _finish_prepared(self, item):
+        """Feature stages for a decoded, classified batch input"""
+        image, key, phash, classification = item
+        try:
+            result, classified = self._analyze_decoded(image, classification)
+            self._cache_store(key, result, phash, classified)
+            return result
+        except Exception as e:
+            return self._error_result(e)
+    
+    def _map_batch(self, func, items):
+        """func over items in order, on the batch thread pool when it helps"""
+        if len(items) <= 1 or self.batch_workers <= 1:
+            return [func(item) for item in items]
+        return list(self._batch_executor().map(func, items))
+    
+    def _batch_executor(self):
+        """Thread pool for analyze_batch, created on first use in each process"""
+        with self._batch_pool_lock:
+            if self._batch_pool is None or self._batch_pool_pid != os.getpid():
+                self._batch_pool = ThreadPoolExecutor(max_workers=self.batch_workers, thread_name_prefix='analyze-batch')
+                self._batch_pool_pid = os.getpid()
+            return self._batch_pool
+    
+    def enable_micro_batching(self, max_batch_size=8, max_wait_ms=10):
+        """
+        Batch single-image classification across concurrent requests
+        
+        Calls to analyze_image/analyze_bytes/analyze_stream from different
+        threads are held for up to `max_wait_ms` and classified together in
+        one forward pass of up to `max_batch_size` images.
+        """
+        if self.batcher is None:
+            self.max_batch_size = max_batch_size
+            self.batcher = MicroBatcher(
+                self._run_classifier_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                name='classifier-batcher'
+            )
+        return self.batcher
+    
+    def enable_process_pool(self, workers=2, warm_up=True):
+        """
+        Run the color, style and texture stages in worker processes
+        
+        Each image is shared with the workers through shared memory and its
+        three stages run concurrently, while classification proceeds in
+        this process. Feature settings are copied into the workers when the
+        pool is created, so change them before calling this.
+        
+        Args:
+            workers (int): Worker processes
+            warm_up (bool): Start the workers now instead of on first use
+        """
+        if self.feature_pool is None:
+            extractor = self.color_extractor
+            self.feature_pool = FeatureStagePool(workers, {
+                'color_extractor': {
+                    'n_colors': extractor.n_colors,
+                    'pixel_budget': extractor.pixel_budget,
+                    'quant_bits': extractor.quant_bits,
+                    'sampling': extractor.sampling,
+                    'random_state': extractor.random_state
+                },
+                'texture_size': self.texture_size,
+                'lbp_radius': self.lbp_radius,
+                'lbp_neighbors': self.lbp_neighbors
+            })
+            if warm_up:
+                self.feature_pool.warm_up()
+        return self.feature_pool
+    
+    def enable_cache(self, max_entries=1024, ttl=24 * 3600, disk_path=None, phash_distance=-1):
+        """
+        Put a content-addressed result cache in front of analysis
+        
+        Uploads are keyed by the SHA-256 of their bytes, and optionally
+        matched to near-duplicates by perceptual hash. See AnalysisCache for
+        the meaning of the arguments.
+        """
+        if self.cache is None:
+            self.cache = AnalysisCache(
+                self.cache_version(),
+                max_entries=max_entries,
+                ttl=ttl,
+                disk_path=disk_path,
+                phash_distance=phash_distance
+            )
+        return self.cache
+    
+    def cache_version(self):
+        """Key that changes whenever a cached analysis would come out differently"""
+        extractor = self.color_extractor
+        return "|".join(str(part) for part in (
+            self.ANALYZER_VERSION,
+            self.MODEL_NAME,
+            "int8" if self.quantize else "fp32",
+            self.max_side,
+            self.texture_size,
+            self.lbp_radius,
+            self.lbp_neighbors,
+            extractor.n_colors,
+            extractor.pixel_budget,
+            extractor.quant_bits,
+            extractor.sampling
+        ))
+    
+    def _cache_lookup(self, source):
+        """(content hash, cached result) for an undecoded source"""
+        if self.cache is None:
+            return None, None
+        key = content_hash(source)
+        return key, self.cache.get(key)
+    
+    def _cache_lookup_similar(self, image):
+        """(perceptual hash, near-duplicate result) for a decoded image"""
+        if self.cache is None or not self.cache.uses_phash:
+            return None, None
+        phash = image.perceptual_hash()
+        return phash, self.cache.find_similar(phash)
+    
+    def _cache_store(self, key, result, phash, classified):
+        """Remember a successful analysis whose type came from the classifier"""
+        # Results classified by the fallback heuristics (model loading, failed
+        # or erroring) must not outlive the outage
+        if self.cache is not None and key is not None and classified:
+            self.cache.put(key, result, phash)
+    
+    def _decode(self, source):
+        """Decode and normalize a path, bytes-like object or stream into an image context"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        return DecodedImage.open(source, max_side=self.max_side)
+    
+    def _analyze_source(self, source):
+        """Decode a path or stream once and analyze it, consulting the cache first"""
+        try:
+            key, cached = self._cache_lookup(source)
+            if cached is not None:
+                return cached
+            
+            # Decode once; every stage reads from the shared context
+            image = self._decode(source)
+            
+            phash, cached = self._cache_lookup_similar(image)
+            if cached is not None:
+                return cached
+            
+            result, classified = self._analyze_decoded(image)
+            self._cache_store(key, result, phash, classified)
+            return result
             
+        except Exception as e:
+            return self._error_result(e)
+    
+    def _analyze_decoded(self, image, classification=None):
+        """(analysis, whether the classifier typed it) for a decoded image context"""
+        # Feature stages go to the process pool first so they overlap with classification
+        stages = self._submit_feature_stages(image)
+        
+        # Extract clothing type and style
+        if classification is None:
+            classification = self._classify_clothing_type(image.pil)
+        clothing_type, classified = classification
+        
+        if stages is not None:
+            features = self._collect_feature_stages(stages, image)
+            colors, style_attributes, texture_info = features['colors'], features['style'], features['texture']
+        else:
             # Extract dominant colors
             colors = self._extract_colors(image)
             
             # Analyze style attributes
-            style_attributes = self._analyze_style(image, pil_image)
+            style_attributes = self._analyze_style(image)
             
             # Extract texture and pattern information
             texture_info = self._analyze_texture(image)
-            
-            # Determine formality level
-            formality = self._determine_formality(clothing_type, style_attributes)
-            
-            return {
-                "clothing_type": clothing_type,
-                "dominant_colors": colors,
-                "style_attributes": style_attributes,
-                "texture": texture_info,
-                "formality_level": formality,
-                "season_suitability": self._determine_season(clothing_type, colors),
-                "confidence_score": 0.85  # You can implement actual confidence scoring
-            }
-            
+        
+        # Determine formality level
+        formality = self._determine_formality(clothing_type, style_attributes)
+        
+        analysis = {
+            "clothing_type": clothing_type,
+            "dominant_colors": colors,
+            "style_attributes": style_attributes,
+            "texture": texture_info,
+            "formality_level": formality,
+            "season_suitability": self._determine_season(clothing_type, colors),
+            "confidence_score": 0.85  # You can implement actual confidence scoring
+        }
+        return analysis, classified
+    
+    def _submit_feature_stages(self, image):
+        """Start the feature stages in the process pool, None to run them inline"""
+        if self.feature_pool is None:
+            return None
+        try:
+            return self.feature_pool.submit(image.rgb)
+        except Exception as e:
+            print(f"Feature pool unavailable, running stages inline: {e}")
+            self.feature_pool.record_fallback()
+            return None
+    
+    def _collect_feature_stages(self, stages, image):
+        """Results of pooled feature stages, recomputing inline if the pool failed"""
+        try:
+            return stages.results()
         except Exception as e:
+            print(f"Feature pool failed, running stages inline: {e}")
+            self.feature_pool.record_fallback()
             return {
-                "error": f"Analysis failed: {str(e)}",
-                "clothing_type": "unknown",
-                "dominant_colors": [],
-                "style_attributes": {},
-                "texture": {"pattern": "unknown", "material": "unknown"},
-                "formality_level": "casual",
-                "season_suitability": ["spring", "fall"],
-                "confidence_score": 0.0
+                'colors': self._extract_colors(image),
+                'style': self._analyze_style(image),
+                'texture': self._analyze_texture(image)
             }
+        finally:
+            stages.release()
+    
+    def _error_result(self, error):
+        """Fallback analysis returned when an image cannot be analyzed"""
+        return {
+            "error": f"Analysis failed: {str(error)}",
+            "clothing_type": "unknown",
+            "dominant_colors": [],
+            "style_attributes": {},
+            "texture": {"pattern": "unknown", "material": "unknown"},
+            "formality_level": "casual",
+            "season_suitability": ["spring", "fall"],
+            "confidence_score": 0.0
+        }
     
     def _classify_clothing_type(self, pil_image):
-        """Classify the type of clothing item"""
+        """(clothing type, whether the classifier produced it) for one image"""
         try:
-            # Use the pre-trained model to classify
-            results = self.classifier(pil_image)
-            
-            # Map model outputs to clothing categories
-            clothing_mapping = {
-                'suit': 'suit',
-                'dress': 'dress',
-                'shirt': 'shirt',
-                'blouse': 'blouse',
-                'sweater': 'sweater',
-                'jacket': 'jacket',
-                'coat': 'outerwear',
-                'pants': 'pants',
-                'jeans': 'jeans',
-                'skirt': 'skirt',
-                'shorts': 'shorts',
-                't-shirt': 't-shirt',
-                'polo': 'polo',
-                'hoodie': 'hoodie',
-                'cardigan': 'cardigan',
-                'blazer': 'blazer'
-            }
-            
-            # Find the best match
-            best_match = results[0]['label'].lower()
-            for key in clothing_mapping:
-                if key in best_match:
-                    return clothing_mapping[key]
+            # Use the pre-trained model to classify; concurrent callers share
+            # one forward pass when micro-batching is enabled
+            if self.batcher is not None:
+                results = self.batcher(pil_image)
+            else:
+                results = self._infer(pil_image)
             
-            # Fallback classification based on image analysis
-            return self._fallback_classification(pil_image)
+            return self._map_classification(results, pil_image), True
             
         except Exception as e:
-            return self._fallback_classification(pil_image)
+            return self._fallback_classification(pil_image), False
+    
+    def _classify_batch(self, pil_images):
+        """(clothing type, whether the classifier produced it) per image, from one batched forward pass"""
+        try:
+            batch_results = self._run_classifier_batch(pil_images)
+        except Exception as e:
+            return [(self._fallback_classification(pil_image), False) for pil_image in pil_images]
+        
+        classifications = []
+        for results, pil_image in zip(batch_results, pil_images):
+            try:
+                classifications.append((self._map_classification(results, pil_image), True))
+            except Exception as e:
+                classifications.append((self._fallback_classification(pil_image), False))
+        return classifications
+    
+    def _run_classifier_batch(self, pil_images):
+        """Raw classifier output for a list of images, run as one batch"""
+        return self._infer(list(pil_images), batch_size=len(pil_images))
+    
+    def _map_classification(self, results, pil_image):
+        """Map raw model labels to our clothing categories"""
+        # Find the best match
+        best_match = results[0]['label'].lower()
+        for key in self.CLOTHING_MAPPING:
+            if key in best_match:
+                return self.CLOTHING_MAPPING[key]
+        
+        # Fallback classification based on image analysis
+        return self._fallback_classification(pil_image)
     
     def _fallback_classification(self, pil_image):
         """Fallback clothing classification using basic image analysis"""
-        # Convert to numpy array
-        img_array = np.array(pil_image)
-        height, width = img_array.shape[:2]
+        width, height = pil_image.size
         
         # Basic heuristics based on aspect ratio and shape
         aspect_ratio = width / height
@@ -135,17 +622,8 @@ class ClothingAnalyzer:
     def _extract_colors(self, image):
         """Extract dominant colors from the clothing item"""
         try:
-            # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # Reshape image to be a list of pixels
-            pixels = rgb_image.reshape(-1, 3)
-            
-            # Use KMeans to find dominant colors
-            kmeans = KMeans(n_clusters=min(5, len(np.unique(pixels, axis=0))), random_state=42)
-            kmeans.fit(pixels)
-            
-            colors = kmeans.cluster_centers_.astype(int)
+            # Sample a bounded number of pixels and cluster their histogram
+            colors = self.color_extractor.extract(image.rgb)
             
             # Convert to color names and hex
             color_info = []
@@ -197,21 +675,18 @@ class ClothingAnalyzer:
         else:
             return "mixed"
     
-    def _analyze_style(self, image, pil_image):
+    def _analyze_style(self, image):
         """Analyze style attributes of the clothing"""
         try:
-            # Convert to grayscale for pattern analysis
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
             # Detect edges for pattern analysis
-            edges = cv2.Canny(gray, 50, 150)
-            edge_density = np.sum(edges > 0) / (edges.shape[0] * edges.shape[1])
+            edges = cv2.Canny(image.gray, 50, 150)
+            edge_density = float(np.count_nonzero(edges)) / edges.size
             
             # Determine style attributes
             attributes = {
                 "has_patterns": edge_density > 0.1,
                 "complexity": "high" if edge_density > 0.15 else "medium" if edge_density > 0.05 else "low",
-                "style_era": self._determine_style_era(pil_image),
+                "style_era": self._determine_style_era(image.pil),
                 "fit_type": self._analyze_fit(image),
                 "sleeve_type": self._analyze_sleeves(image),
                 "neckline": self._analyze_neckline(image)
@@ -232,32 +707,9 @@ class ClothingAnalyzer:
     def _analyze_texture(self, image):
         """Analyze texture and material properties"""
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Calculate local binary pattern for texture
-            def local_binary_pattern(img):
-                rows, cols = img.shape
-                lbp = np.zeros((rows-2, cols-2), dtype=np.uint8)
-                
-                for i in range(1, rows-1):
-                    for j in range(1, cols-1):
-                        center = img[i, j]
-                        code = 0
-                        if img[i-1, j-1] >= center: code |= 1
-                        if img[i-1, j] >= center: code |= 2
-                        if img[i-1, j+1] >= center: code |= 4
-                        if img[i, j+1] >= center: code |= 8
-                        if img[i+1, j+1] >= center: code |= 16
-                        if img[i+1, j] >= center: code |= 32
-                        if img[i+1, j-1] >= center: code |= 64
-                        if img[i, j-1] >= center: code |= 128
-                        lbp[i-1, j-1] = code
-                
-                return lbp
-            
             # Resize for faster processing
-            small_gray = cv2.resize(gray, (100, 100))
-            lbp = local_binary_pattern(small_gray)
+            small_gray = image.resized('gray', self.texture_size)
+            lbp = local_binary_pattern(small_gray, self.lbp_radius, self.lbp_neighbors)
             texture_uniformity = np.std(lbp)
             
             # Determine texture type
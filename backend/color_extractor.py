@@ -0,0 +1,125 @@
+import math
+import numpy as np
+
+
+class DominantColorExtractor:
+    """
+    Dominant color extraction with a fixed pixel budget
+
+    The image is first reduced to at most `pixel_budget` pixels, the sample
+    is collapsed into a quantized color histogram (`quant_bits` per channel)
+    and k-means then runs over the occupied histogram bins weighted by their
+    pixel counts. Work and memory are bounded by the budget and the number
+    of bins, not by the size of the upload.
+    """
+
+    SAMPLING_MODES = ('stride', 'random')
+
+    def __init__(self, n_colors=5, pixel_budget=20000, quant_bits=5, sampling='stride', random_state=42):
+        if sampling not in self.SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode: {sampling}")
+        if not 1 <= quant_bits <= 8:
+            raise ValueError("quant_bits must be between 1 and 8")
+
+        self.n_colors = n_colors
+        self.pixel_budget = pixel_budget
+        self.quant_bits = quant_bits
+        self.sampling = sampling
+        self.random_state = random_state
+
+    def extract(self, image, channels='rgb'):
+        """
+        Find the dominant colors of an image
+
+        Args:
+            image (np.ndarray): HxWx3 uint8 image
+            channels (str): Channel order of `image`, 'rgb' or 'bgr'
+
+        Returns:
+            np.ndarray: (k, 3) integer RGB cluster centers, most common first
+        """
+        # Imported here so scikit-learn is not loaded at application startup
+        from sklearn.cluster import KMeans
+
+        pixels = self.sample(image)
+        if channels == 'bgr':
+            pixels = pixels[:, ::-1]
+
+        bin_colors, bin_counts = self._histogram(pixels)
+        n_clusters = min(self.n_colors, len(bin_colors))
+
+        kmeans = KMeans(
+            n_clusters=n_clusters,
+            init=self._seed_centers(bin_colors, bin_counts, n_clusters),
+            n_init=1,
+            random_state=self.random_state
+        )
+        kmeans.fit(bin_colors, sample_weight=bin_counts)
+
+        # Order clusters by how many pixels they cover
+        cluster_weights = np.bincount(kmeans.labels_, weights=bin_counts, minlength=n_clusters)
+        order = np.argsort(-cluster_weights, kind='stable')
+
+        return np.clip(kmeans.cluster_centers_[order], 0, 255).astype(int)
+
+    def sample(self, image):
+        """Reduce an image to at most `pixel_budget` pixels as an (n, 3) array"""
+        height, width = image.shape[:2]
+        total = height * width
+
+        if total <= self.pixel_budget:
+            return image.reshape(-1, 3)
+
+        if self.sampling == 'random':
+            rng = np.random.default_rng(self.random_state)
+            rows = rng.integers(0, height, size=self.pixel_budget)
+            cols = rng.integers(0, width, size=self.pixel_budget)
+            return image[rows, cols]
+
+        # Stratified grid: one pixel per stride x stride cell
+        stride = int(math.ceil(math.sqrt(total / self.pixel_budget)))
+        return np.ascontiguousarray(image[::stride, ::stride]).reshape(-1, 3)
+
+    def _histogram(self, pixels):
+        """Collapse pixels into occupied quantized bins (mean color, count)"""
+        shift = 8 - self.quant_bits
+        q = (pixels >> shift).astype(np.int64)
+        bins = (q[:, 0] << (2 * self.quant_bits)) | (q[:, 1] << self.quant_bits) | q[:, 2]
+
+        n_bins = 1 << (3 * self.quant_bits)
+        counts = np.bincount(bins, minlength=n_bins)
+        occupied = np.nonzero(counts)[0]
+
+        # Mean of the real pixel values in each bin, not the bin corner
+        means = np.empty((len(occupied), 3), dtype=np.float64)
+        for channel in range(3):
+            sums = np.bincount(bins, weights=pixels[:, channel], minlength=n_bins)
+            means[:, channel] = sums[occupied] / counts[occupied]
+
+        return means, counts[occupied].astype(np.float64)
+
+    def _seed_centers(self, bin_colors, bin_counts, n_clusters):
+        """Seed k-means from the most populated, mutually distinct histogram peaks"""
+        order = np.argsort(-bin_counts, kind='stable')
+        min_distance = float(1 << (8 - self.quant_bits)) * 2
+
+        seeds = []
+        for index in order:
+            color = bin_colors[index]
+            if all(np.linalg.norm(color - seed) >= min_distance for seed in seeds):
+                seeds.append(color)
+                if len(seeds) == n_clusters:
+                    break
+
+        # Not enough distinct peaks: fill with the next most common bins
+        if len(seeds) < n_clusters:
+            chosen = {tuple(seed) for seed in seeds}
+            for index in order:
+                color = bin_colors[index]
+                if tuple(color) not in chosen:
+                    seeds.append(color)
+                    chosen.add(tuple(color))
+                    if len(seeds) == n_clusters:
+                        break
+
+        return np.array(seeds)
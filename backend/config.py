@@ -28,7 +28,60 @@ class Config:
     # AI Model settings
     USE_GPU = os.getenv('USE_GPU', 'False').lower() == 'true'
     MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', './model_cache')
+    MODEL_OFFLINE = os.getenv('MODEL_OFFLINE', 'False').lower() == 'true'
+    MODEL_QUANTIZE = os.getenv('MODEL_QUANTIZE', 'False').lower() == 'true'
+    TORCH_NUM_THREADS = int(os.getenv('TORCH_NUM_THREADS', 0))  # 0 keeps torch's default
+    MODEL_LOAD_MODE = os.getenv('MODEL_LOAD_MODE', 'background')  # background, preload or lazy
+    MODEL_LOAD_TIMEOUT = float(os.getenv('MODEL_LOAD_TIMEOUT', 120))
+    INFERENCE_BATCH_SIZE = int(os.getenv('INFERENCE_BATCH_SIZE', 8))  # 1 disables micro-batching
+    INFERENCE_BATCH_WAIT_MS = float(os.getenv('INFERENCE_BATCH_WAIT_MS', 10))
+    ANALYSIS_MAX_SIDE = int(os.getenv('ANALYSIS_MAX_SIDE', 1024))  # Longest image side analyzed (0 = full resolution)
+    FEATURE_WORKERS = int(os.getenv('FEATURE_WORKERS', 0))  # Processes for color/style/texture stages (0 runs them inline)
+    
+    # Analysis result cache
+    ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', 1024))  # 0 disables the cache
+    ANALYSIS_CACHE_TTL = float(os.getenv('ANALYSIS_CACHE_TTL', 24 * 3600))
+    ANALYSIS_CACHE_PATH = os.getenv('ANALYSIS_CACHE_PATH', '')  # sqlite file for the persistent tier
+    ANALYSIS_CACHE_PHASH_DISTANCE = int(os.getenv('ANALYSIS_CACHE_PHASH_DISTANCE', -1))  # -1 disables near-duplicate hits
     
     # Web scraping settings
-    REQUEST_DELAY = float(os.getenv('REQUEST_DELAY', 1.0))
+    REQUEST_DELAY = float(os.getenv('REQUEST_DELAY', 1.0))  # Seconds between requests to the same site
+    RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', 1))  # Requests a site may receive back to back
     MAX_PRODUCTS_PER_SEARCH = int(os.getenv('MAX_PRODUCTS_PER_SEARCH', 10))
+    SEARCH_WORKERS = int(os.getenv('SEARCH_WORKERS', 8))  # Shared thread pool for product searches
+    SEARCH_MAX_PER_HOST = int(os.getenv('SEARCH_MAX_PER_HOST', 2))  # Concurrent requests per shopping site
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))  # Retries on 429/503 responses
+    HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', 0.5))  # Exponential backoff factor in seconds (at least one REQUEST_DELAY)
+    HTML_PARSER = os.getenv('HTML_PARSER', 'auto')  # auto, selectolax, lxml or bs4
+    SEARCH_STREAMING = os.getenv('SEARCH_STREAMING', 'False').lower() == 'true'  # Stop downloading once enough products are parsed (only when the parser backend is lxml)
+    SEARCH_STREAM_CHUNK_SIZE = int(os.getenv('SEARCH_STREAM_CHUNK_SIZE', 16 * 1024))
+    
+    # Headless browser pool (Selenium searches)
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', 2))  # Most browsers alive at once
+    BROWSER_MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', 50))  # Replace a browser after this many searches
+    BROWSER_CHECKOUT_TIMEOUT = float(os.getenv('BROWSER_CHECKOUT_TIMEOUT', 30))  # Seconds to wait for a free browser
+    BROWSER_BLOCK_RESOURCES = os.getenv('BROWSER_BLOCK_RESOURCES', 'True').lower() == 'true'  # Skip images, CSS and fonts
+    
+    # Style recommendation cache
+    MATCH_CACHE_SIZE = int(os.getenv('MATCH_CACHE_SIZE', 1024))  # Memoized find_matches results, 0 disables
+    
+    # Search result cache
+    SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', 2048))  # 0 disables the cache
+    SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', 3600))  # Seconds a result is fresh
+    SEARCH_CACHE_STALE_TTL = float(os.getenv('SEARCH_CACHE_STALE_TTL', 6 * 3600))  # Served stale while refreshing
+    SEARCH_CACHE_PATH = os.getenv('SEARCH_CACHE_PATH', '')  # sqlite file for the persistent tier
+    
+    # Background job queue (/api/jobs)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # Jobs running at once
+    JOB_QUEUE_MAX_DEPTH = int(os.getenv('JOB_QUEUE_MAX_DEPTH', 50))  # Waiting jobs before new ones get 429
+    JOB_RESULT_TTL = float(os.getenv('JOB_RESULT_TTL', 3600))  # Seconds finished jobs stay pollable
+    JOB_STORE_PATH = os.getenv('JOB_STORE_PATH')  # Job state shared by server processes; unset = <instance dir>/jobs.sqlite3, '' = this process only
+    JOB_LEASE_TTL = float(os.getenv('JOB_LEASE_TTL', 30))  # Seconds before a dead process's unfinished jobs read as failed
+    
+    # Upload settings
+    UPLOAD_SPOOL_THRESHOLD = int(os.getenv('UPLOAD_SPOOL_THRESHOLD', 4 * 1024 * 1024))  # Keep uploads in memory up to 4MB
+    
+    # Batch analysis (/api/analyze-batch)
+    BATCH_MAX_IMAGES = int(os.getenv('BATCH_MAX_IMAGES', 32))  # Images per batch request
+    BATCH_PAYLOAD_FACTOR = int(os.getenv('BATCH_PAYLOAD_FACTOR', 8))  # Batch request limit = MAX_CONTENT_LENGTH x this
+    BATCH_DECODE_WORKERS = int(os.getenv('BATCH_DECODE_WORKERS', 4))  # Threads decoding and analyzing batch images
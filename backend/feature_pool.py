@@ -0,0 +1,185 @@
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Feature stages that can run in a worker process, by ClothingAnalyzer method
+STAGES = {
+    'colors': '_extract_colors',
+    'style': '_analyze_style',
+    'texture': '_analyze_texture'
+}
+
+# Analyzer used by the stages inside each worker process (set by _init_worker)
+_worker_analyzer = None
+
+
+def _attach(name):
+    """Open an existing shared memory block without taking ownership of it"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(settings):
+    """Build a model-less analyzer with the parent's feature settings"""
+    global _worker_analyzer
+    # Imported here: clothing_analyzer imports this module
+    from clothing_analyzer import ClothingAnalyzer
+    from color_extractor import DominantColorExtractor
+
+    analyzer = ClothingAnalyzer(load_model=False)
+    analyzer.color_extractor = DominantColorExtractor(**settings['color_extractor'])
+    analyzer.texture_size = settings['texture_size']
+    analyzer.lbp_radius = settings['lbp_radius']
+    analyzer.lbp_neighbors = settings['lbp_neighbors']
+    _worker_analyzer = analyzer
+
+
+def _run_stage(stage, name, shape):
+    """Run one feature stage on an RGB image held in shared memory"""
+    from image_context import DecodedImage
+
+    block = _attach(name)
+    rgb = image = None
+    try:
+        rgb = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+        image = DecodedImage.from_array(rgb)
+        return getattr(_worker_analyzer, STAGES[stage])(image)
+    finally:
+        # Drop every view of the buffer before closing the mapping
+        rgb = image = None
+        block.close()
+
+
+def _noop():
+    return os.getpid()
+
+
+class StageBatch:
+    """
+    Feature stages of one image in flight in the process pool
+
+    Owns the shared memory block holding the image until release().
+    """
+
+    def __init__(self, block, futures):
+        self._block = block
+        self.futures = futures
+
+    def results(self, timeout=None):
+        """{stage: result} once every stage has finished"""
+        return {stage: future.result(timeout=timeout) for stage, future in self.futures.items()}
+
+    def release(self):
+        """Free the shared image once the workers are done with it"""
+        for future in self.futures.values():
+            future.cancel()
+        self._block.close()
+        self._block.unlink()
+
+
+class FeatureStagePool:
+    """
+    Process pool running ClothingAnalyzer's CPU-bound feature stages
+
+    The decoded RGB image is copied once into a shared memory block and
+    every stage attaches to it by name, so pixel buffers are never pickled.
+    Independent stages of one image are submitted together and run on
+    different workers at the same time. Workers are started with the
+    'spawn' method so they never inherit the parent's threads or model,
+    and a pool created before a fork is rebuilt in the child on first use.
+    """
+
+    def __init__(self, workers, settings, start_method='spawn'):
+        """
+        Args:
+            workers (int): Worker processes
+            settings (dict): Feature settings copied into each worker
+                (color_extractor kwargs, texture_size, lbp_radius, lbp_neighbors)
+            start_method (str): multiprocessing start method for the workers
+        """
+        self.workers = max(1, workers)
+        self.settings = settings
+        self.start_method = start_method
+
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.images = 0
+        self.fallbacks = 0
+
+    def submit(self, rgb, stages=tuple(STAGES)):
+        """
+        Start feature stages for one image
+
+        Args:
+            rgb (np.ndarray): HxWx3 uint8 RGB image
+            stages (tuple): Names from STAGES to run
+
+        Returns:
+            StageBatch: Call results() and then release()
+        """
+        rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+        block = shared_memory.SharedMemory(create=True, size=max(1, rgb.nbytes))
+        try:
+            np.ndarray(rgb.shape, dtype=np.uint8, buffer=block.buf)[...] = rgb
+            executor = self._get_executor()
+            futures = {stage: executor.submit(_run_stage, stage, block.name, rgb.shape) for stage in stages}
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+
+        with self._lock:
+            self.images += 1
+        return StageBatch(block, futures)
+
+    def record_fallback(self):
+        """Count an image whose stages had to run inline"""
+        with self._lock:
+            self.fallbacks += 1
+
+    def warm_up(self):
+        """Start every worker now rather than on the first request"""
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        """Shut the worker processes down"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        """Worker count and images processed"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "images": self.images,
+                "inline_fallbacks": self.fallbacks
+            }
+
+    def _get_executor(self):
+        """The process pool for the current process, created on first use"""
+        with self._lock:
+            # A worker that died (e.g. killed for memory) breaks the whole
+            # executor; replace it so later images use the pool again
+            broken = self._executor is not None and getattr(self._executor, '_broken', False)
+            if self._executor is None or self._pid != os.getpid() or broken:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.settings,)
+                )
+                self._pid = os.getpid()
+            return self._executor
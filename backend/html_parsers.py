@@ -0,0 +1,341 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxHTMLParser
+except ImportError:
+    _SelectolaxHTMLParser = None
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    from cssselect import HTMLTranslator
+except ImportError:
+    CSSSelector = None
+
+# Fields read from an attribute of the matched element instead of its text
+ATTRIBUTE_FIELDS = {'link': 'href', 'image': 'src'}
+
+# Selectors simple enough to turn into a SoupStrainer: tag, .class or [attr="value"]
+_SIMPLE_SELECTOR = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?(?:\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?:="(?P<value>[^"]*)")?\])?$'
+)
+
+
+def _clean_text(text: str) -> str:
+    """Collapse whitespace the same way for every backend"""
+    return ' '.join(text.split())
+
+
+class ResultPageParser(ABC):
+    """
+    Extract product fields from a search results page
+
+    Built from a site's `selectors` (see WebSearcher.shopping_sites): the
+    'products' selector finds the result containers and every other entry
+    names a field read from the first match inside a container. Selectors
+    are compiled once when the parser is created, so parse() only walks the
+    page. Subclasses wrap one HTML library each.
+    """
+
+    name = None
+
+    def __init__(self, selectors: Dict[str, str], text_patterns: Dict[str, str] = None):
+        """
+        Args:
+            selectors: CSS selectors keyed by field, including 'products'
+            text_patterns: Optional regex per field; the first match whose
+                text contains the pattern is used instead of the first match
+        """
+        if 'products' not in selectors:
+            raise ValueError("selectors must include a 'products' selector")
+
+        self.selectors = dict(selectors)
+        self.fields = [field for field in selectors if field != 'products']
+        self.text_patterns = {field: re.compile(pattern) for field, pattern in (text_patterns or {}).items()}
+        self._compile()
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether the library behind this backend is installed"""
+        return True
+
+    def parse(self, html: Any, limit: int = None) -> List[Dict[str, Optional[str]]]:
+        """
+        Extract the fields of every result container on a page
+
+        Args:
+            html: Page body as bytes or str
+            limit: Stop after this many result containers
+
+        Returns:
+            One dict per container mapping each field to its value, None
+            when the field's selector matched nothing
+        """
+        if not html or not html.strip():
+            return []
+
+        return [
+            {field: self._field(container, field) for field in self.fields}
+            for container in self._containers(html, limit)
+        ]
+
+    def _field(self, container, field):
+        """Value of one field inside a container"""
+        attribute = ATTRIBUTE_FIELDS.get(field)
+        pattern = self.text_patterns.get(field)
+
+        for element in self._matches(container, field):
+            if attribute:
+                return self._attribute(element, attribute)
+            text = _clean_text(self._text(element))
+            if pattern is None or pattern.search(text):
+                return text
+        return None
+
+    @abstractmethod
+    def _compile(self):
+        """Compile self.selectors for this backend"""
+
+    @abstractmethod
+    def _containers(self, html, limit) -> Iterator[Any]:
+        """Result containers of a page, at most `limit` of them"""
+
+    @abstractmethod
+    def _matches(self, container, field) -> Iterator[Any]:
+        """Elements inside a container matching a field's selector"""
+
+    @abstractmethod
+    def _text(self, element) -> str:
+        """Text content of an element"""
+
+    @abstractmethod
+    def _attribute(self, element, name) -> Optional[str]:
+        """An attribute of an element, None when it is missing"""
+
+
+class SelectolaxResultParser(ResultPageParser):
+    """selectolax on the lexbor engine (C parser and CSS matcher); the fastest backend"""
+
+    name = 'selectolax'
+
+    @classmethod
+    def available(cls) -> bool:
+        return _SelectolaxHTMLParser is not None
+
+    def _compile(self):
+        """selectolax takes selector strings; validate them once up front"""
+        probe = _SelectolaxHTMLParser('<html></html>')
+        for selector in self.selectors.values():
+            probe.css(selector)
+
+    def _containers(self, html, limit):
+        containers = _SelectolaxHTMLParser(html).css(self.selectors['products'])
+        return containers[:limit] if limit is not None else containers
+
+    def _matches(self, container, field):
+        if field in self.text_patterns:
+            return iter(container.css(self.selectors[field]))
+        first = container.css_first(self.selectors[field])
+        return iter([first] if first is not None else [])
+
+    def _text(self, element):
+        return element.text(separator=' ')
+
+    def _attribute(self, element, name):
+        return element.attributes.get(name)
+
+
+class LxmlResultParser(ResultPageParser):
+    """
+    lxml with selectors translated to XPath once through cssselect
+
+    Also the streaming backend: parse_stream() feeds an incremental parser
+    as the page downloads and stops as soon as enough containers are
+    complete. Give the 'products' selector a tag (div[...], div.cls) so
+    the parser only reports those elements; otherwise every element of
+    the page goes through Python and streaming costs more than it saves.
+    """
+
+    name = 'lxml'
+
+    @classmethod
+    def available(cls) -> bool:
+        return CSSSelector is not None
+
+    def _compile(self):
+        self._compiled = {
+            field: CSSSelector(selector, translator='html')
+            for field, selector in self.selectors.items()
+        }
+        # Tests a single element against the products selector; only
+        # compound selectors (no descendant combinators) can match this way
+        self._is_container = etree.XPath(
+            HTMLTranslator().css_to_xpath(self.selectors['products'], prefix='self::')
+        )
+        # Cheap checks run before the XPath on every parsed element: the
+        # pull parser only reports elements with this tag, and the XPath
+        # only runs on elements carrying the class or attribute
+        match = _SIMPLE_SELECTOR.match(self.selectors['products'].strip())
+        self._container_tag = match.group('tag') if match else None
+        self._container_class = match.group('cls') if match else None
+        self._container_attribute = match.group('attr') if match else None
+
+    def parse_stream(self, chunks: Iterator[bytes], limit: int = None,
+                     encoding: str = None) -> List[Dict[str, Optional[str]]]:
+        """
+        Extract result containers from a page while it is still downloading
+
+        A container is extracted once its closing tag has been parsed, so
+        its fields are complete. Iteration over `chunks` stops as soon as
+        `limit` containers are done; the caller should then close the
+        response to drop the rest of the body.
+
+        Args:
+            chunks: Body chunks as they arrive, e.g. response.iter_content()
+            limit: Stop after this many result containers
+            encoding: Charset from the response headers, if any
+
+        Returns:
+            Same as parse()
+        """
+        parser = etree.HTMLPullParser(events=('end',), tag=self._container_tag, encoding=encoding)
+        results = []
+
+        for chunk in chunks:
+            parser.feed(chunk)
+            if self._collect(parser, results, limit):
+                return results
+
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            # Empty or truncated page: keep whatever was extracted
+            return results
+        self._collect(parser, results, limit)
+        return results
+
+    def _collect(self, parser, results, limit):
+        """Extract newly completed containers; True once limit is reached"""
+        for _, element in parser.read_events():
+            if self._container_attribute is not None and element.get(self._container_attribute) is None:
+                continue
+            if self._container_class is not None and self._container_class not in element.get('class', ''):
+                continue
+            if not self._is_container(element):
+                continue
+
+            results.append({field: self._field(element, field) for field in self.fields})
+            if limit is not None and len(results) >= limit:
+                return True
+
+            # Done with this container and everything parsed before it
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+        return False
+
+    def _containers(self, html, limit):
+        document = lxml.html.document_fromstring(html)
+        containers = self._compiled['products'](document)
+        return containers[:limit] if limit is not None else containers
+
+    def _matches(self, container, field):
+        return iter(self._compiled[field](container))
+
+    def _text(self, element):
+        return ' '.join(element.itertext())
+
+    def _attribute(self, element, name):
+        return element.get(name)
+
+
+class SoupResultParser(ResultPageParser):
+    """
+    BeautifulSoup fallback with partial parsing
+
+    When the 'products' selector is a plain tag, class or attribute match,
+    a SoupStrainer keeps only the result containers (and their children)
+    in the tree, which skips building the rest of the page.
+    """
+
+    name = 'bs4'
+
+    def _compile(self):
+        self._compiled = {field: soupsieve.compile(selector) for field, selector in self.selectors.items()}
+        self._strainer = self._strainer_for(self.selectors['products'])
+        self._features = 'lxml' if CSSSelector is not None else 'html.parser'
+
+    def _containers(self, html, limit):
+        soup = BeautifulSoup(html, self._features, parse_only=self._strainer)
+        return self._compiled['products'].select(soup, limit=limit or 0)
+
+    def _matches(self, container, field):
+        if field in self.text_patterns:
+            return self._compiled[field].iselect(container)
+        first = self._compiled[field].select_one(container)
+        return iter([first] if first is not None else [])
+
+    def _text(self, element):
+        return element.get_text(' ')
+
+    def _attribute(self, element, name):
+        return element.get(name)
+
+    def _strainer_for(self, selector):
+        """SoupStrainer equivalent of a simple selector, None if there is none"""
+        match = _SIMPLE_SELECTOR.match(selector.strip())
+        if not match or not any(match.groups()):
+            return None
+
+        attrs = {}
+        if match.group('cls'):
+            attrs['class'] = match.group('cls')
+        if match.group('attr'):
+            attrs[match.group('attr')] = match.group('value') if match.group('value') is not None else True
+        return SoupStrainer(match.group('tag'), attrs=attrs)
+
+
+# Preference order used by backend='auto'
+PARSER_BACKENDS = {
+    'selectolax': SelectolaxResultParser,
+    'lxml': LxmlResultParser,
+    'bs4': SoupResultParser
+}
+
+
+def available_backends() -> List[str]:
+    """Installed parser backends, fastest first"""
+    return [name for name, parser_class in PARSER_BACKENDS.items() if parser_class.available()]
+
+
+def create_parser(selectors: Dict[str, str], backend: str = 'auto',
+                  text_patterns: Dict[str, str] = None) -> ResultPageParser:
+    """
+    Build a result page parser for one site
+
+    Args:
+        selectors: CSS selectors keyed by field, including 'products'
+        backend: 'selectolax', 'lxml', 'bs4' or 'auto' for the fastest installed
+        text_patterns: Optional regex per field (see ResultPageParser)
+
+    Returns:
+        ResultPageParser with its selectors compiled
+    """
+    if backend == 'auto':
+        backend = available_backends()[0]
+
+    parser_class = PARSER_BACKENDS.get(backend)
+    if parser_class is None:
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+    if not parser_class.available():
+        raise ValueError(f"HTML parser backend '{backend}' is not installed")
+
+    return parser_class(selectors, text_patterns)
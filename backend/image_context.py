@@ -0,0 +1,120 @@
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+
+class DecodedImage:
+    """
+    An upload decoded exactly once, with lazily cached derived buffers
+
+    Every analysis stage asks this object for the representation it needs
+    (PIL, RGB, BGR, grayscale or a resized variant) instead of converting
+    the image itself, so each conversion happens at most once per request.
+    """
+
+    def __init__(self, pil_image=None, rgb=None):
+        self._pil = pil_image
+        self._rgb = rgb
+        self._bgr = None
+        self._gray = None
+        self._resized = {}
+        self.original_size = None  # (width, height) before normalization, when known
+
+    @classmethod
+    def open(cls, source, max_side=None):
+        """
+        Decode an image from a path or binary file-like object
+
+        This is the normalization stage: EXIF orientation is applied and the
+        image is reduced so its longest side is at most `max_side`. Every
+        derived buffer is then computed at that working resolution.
+
+        Args:
+            source: File path or readable binary stream
+            max_side (int): Longest side of the working image in pixels, or
+                None/0 to keep the full resolution. JPEGs are DCT-scaled
+                while decoding to the smallest size that still covers it,
+                which is much cheaper than a full decode.
+
+        Returns:
+            DecodedImage: Context holding the RGB-decoded image
+        """
+        try:
+            image = Image.open(source)
+            original_size = image.size
+            if max_side and image.format == 'JPEG':
+                image.draft('RGB', (max_side, max_side))
+            # cv2.imread honoured EXIF orientation; keep that behaviour
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGB')
+            if max_side and max(image.size) > max_side:
+                image.thumbnail((max_side, max_side), Image.BICUBIC)
+        except Exception as e:
+            raise ValueError(f"Could not load image: {e}")
+
+        decoded = cls(image)
+        decoded.original_size = original_size
+        return decoded
+
+    @classmethod
+    def from_array(cls, rgb):
+        """Wrap an existing HxWx3 uint8 RGB array (not copied)"""
+        return cls(rgb=rgb)
+
+    @property
+    def pil(self):
+        """The decoded PIL image"""
+        if self._pil is None:
+            self._pil = Image.fromarray(self._rgb)
+        return self._pil
+
+    @property
+    def size(self):
+        """(width, height) of the decoded image"""
+        if self._pil is None:
+            return (self._rgb.shape[1], self._rgb.shape[0])
+        return self._pil.size
+
+    @property
+    def rgb(self):
+        """HxWx3 uint8 RGB array"""
+        if self._rgb is None:
+            self._rgb = np.asarray(self.pil)
+        return self._rgb
+
+    @property
+    def bgr(self):
+        """HxWx3 uint8 BGR array, for OpenCV routines that expect it"""
+        if self._bgr is None:
+            self._bgr = cv2.cvtColor(self.rgb, cv2.COLOR_RGB2BGR)
+        return self._bgr
+
+    @property
+    def gray(self):
+        """HxW uint8 grayscale array"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY)
+        return self._gray
+
+    def resized(self, kind, size, interpolation=cv2.INTER_LINEAR):
+        """
+        Return a cached resized copy of one of the array variants
+
+        Args:
+            kind (str): 'rgb', 'bgr' or 'gray'
+            size (tuple): Target (width, height), as for cv2.resize
+            interpolation (int): OpenCV interpolation flag
+
+        Returns:
+            np.ndarray: The resized array
+        """
+        key = (kind, tuple(size), interpolation)
+        if key not in self._resized:
+            self._resized[key] = cv2.resize(getattr(self, kind), tuple(size), interpolation=interpolation)
+        return self._resized[key]
+
+    def perceptual_hash(self):
+        """64-bit difference hash (dHash) for near-duplicate detection"""
+        small = self.resized('gray', (9, 8), cv2.INTER_AREA)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int(np.packbits(bits).view('>u8')[0])
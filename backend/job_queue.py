@@ -0,0 +1,502 @@
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from process_local import ProcessLocal
+
+# Named priorities accepted by the API; higher runs first
+PRIORITIES = {'low': 0, 'normal': 1, 'high': 2}
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Error of a job whose owning process stopped before finishing it
+ORPHANED_ERROR = "The server process running this job stopped"
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function by check_cancelled() once the job is cancelled"""
+
+
+class Job:
+    """
+    One unit of background work and its observable state
+
+    The job function receives the Job as its first argument. It publishes
+    partial results with update() and calls check_cancelled() between
+    stages so a cancellation stops it at the next safe point.
+    """
+
+    def __init__(self, func: Callable, args: tuple, kwargs: dict, priority: int):
+        self.id = uuid.uuid4().hex
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.sequence = None  # submission order, set by the queue
+
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.partial = {}
+        self.result = None
+        self.error = None
+
+        self._cancel_requested = threading.Event()
+        self._lock = threading.Lock()
+        self._store = None  # JobStore the queue mirrors this job into, if any
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def update(self, **fields):
+        """Merge fields into the job's partial result"""
+        with self._lock:
+            self.partial.update(fields)
+        if self._store is not None:
+            self._store.save(self)
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation has been requested, here or through the shared store"""
+        if not self._cancel_requested.is_set() and self._store is not None and self._store.cancel_requested(self.id):
+            self._cancel_requested.set()
+        if self._cancel_requested.is_set():
+            raise JobCancelled()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot of the job"""
+        with self._lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "priority": self.priority,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "partial": dict(self.partial),
+                "result": self.result,
+                "error": self.error
+            }
+
+
+class JobStore:
+    """
+    sqlite table of job snapshots shared by every server process
+
+    Jobs still run in the process that accepted them, but their state,
+    partial results and cancellation requests go through this table, so
+    any pre-forked worker can answer GET and DELETE /api/jobs/<id>. The
+    connection is opened on first use in each process.
+
+    Each process writes its jobs under a random owner id and renews a lease
+    on them with heartbeat(). An unfinished job whose lease has lapsed
+    belongs to a process that stopped (crashed, restarted, or on a host
+    that is gone); it reads as failed and prune() expires it like any other
+    finished job.
+    """
+
+    def __init__(self, path: str, result_ttl: float = 3600, lease_ttl: float = 30):
+        """
+        Args:
+            path: sqlite file shared by the server processes
+            result_ttl: Seconds finished jobs are kept
+            lease_ttl: Seconds an unfinished job stays owned without a heartbeat
+        """
+        self.path = path
+        self.result_ttl = result_ttl
+        self.lease_ttl = lease_ttl
+        self._db = ProcessLocal(self._open)
+        self._owner = ProcessLocal(lambda: uuid.uuid4().hex)
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's connection (caller holds _lock)"""
+        return self._db.get()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the shared file and create the table"""
+        db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, owner TEXT, heartbeat_at REAL, priority INTEGER, "
+            "sequence INTEGER, status TEXT, created_at REAL, started_at REAL, finished_at REAL, "
+            "partial TEXT, result TEXT, error TEXT, cancel_requested INTEGER DEFAULT 0)"
+        )
+        db.commit()
+        return db
+
+    def save(self, job: 'Job'):
+        """Write a job's current state and renew its lease (keeps a pending cancellation request)"""
+        snapshot = job.to_dict()
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "INSERT INTO jobs (id, owner, heartbeat_at, priority, sequence, status, created_at, started_at, "
+                "finished_at, partial, result, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at, status = excluded.status, "
+                "started_at = excluded.started_at, finished_at = excluded.finished_at, partial = excluded.partial, "
+                "result = excluded.result, error = excluded.error",
+                (job.id, self._owner.get(), time.time(), job.priority, job.sequence, snapshot["status"],
+                 snapshot["created_at"], snapshot["started_at"], snapshot["finished_at"],
+                 json.dumps(snapshot["partial"], default=str), json.dumps(snapshot["result"], default=str),
+                 snapshot["error"])
+            )
+            db.commit()
+
+    def heartbeat(self, now: float):
+        """Renew the lease on every unfinished job of this process"""
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND finished_at IS NULL", (now, self._owner.get())
+            )
+            db.commit()
+
+    def load(self, job_id: str) -> Optional['Job']:
+        """Read-only Job rebuilt from its stored state, or None if unknown"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id, owner, heartbeat_at, priority, sequence, status, created_at, started_at, finished_at, "
+                "partial, result, error, cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job = Job(None, (), {}, row[3])
+        (job.id, job.owner, heartbeat_at, _, job.sequence, job.status, job.created_at, job.started_at,
+         job.finished_at, partial, result, job.error, cancel_requested) = row
+        job.partial = json.loads(partial) if partial else {}
+        job.result = json.loads(result) if result else None
+        if cancel_requested:
+            job._cancel_requested.set()
+
+        if job.status not in FINISHED_STATES and heartbeat_at < time.time() - self.lease_ttl:
+            # The process that owned it stopped renewing its lease; it will never finish
+            job.status, job.error = FAILED, ORPHANED_ERROR
+            job.finished_at = heartbeat_at + self.lease_ttl
+        return job
+
+    def request_cancel(self, job_id: str):
+        """Ask the owning process to cancel a job at its next safe point"""
+        with self._lock:
+            db = self._connection()
+            db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            db.commit()
+
+    def cancel_requested(self, job_id: str) -> bool:
+        """Whether any process has asked for the job to be cancelled"""
+        with self._lock:
+            row = self._connection().execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def position(self, job: 'Job') -> int:
+        """Jobs queued before `job` in its owning process's queue"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT COUNT(*) FROM jobs WHERE owner = ? AND status = ? AND cancel_requested = 0 "
+                "AND (priority > ? OR (priority = ? AND sequence < ?))",
+                (job.owner, QUEUED, job.priority, job.priority, job.sequence)
+            ).fetchone()
+        return row[0]
+
+    def prune(self, now: float):
+        """Mark jobs with a lapsed lease failed, and delete jobs that finished more than result_ttl ago"""
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = heartbeat_at + ? "
+                "WHERE finished_at IS NULL AND heartbeat_at < ?",
+                (FAILED, ORPHANED_ERROR, self.lease_ttl, now - self.lease_ttl)
+            )
+            db.execute("DELETE FROM jobs WHERE finished_at < ?", (now - self.result_ttl,))
+            db.commit()
+
+
+class JobQueue:
+    """
+    In-process priority queue of jobs run by a bounded pool of worker threads
+
+    Workers are separate from the web server's request threads, so a long
+    job holds a worker, not a request. At most `max_depth` jobs may wait at
+    once; higher priorities run first and equal priorities run in
+    submission order. Finished jobs stay queryable for `result_ttl`
+    seconds.
+
+    A job runs in the process that accepted it. With a `store_path`, job
+    state is mirrored into a JobStore shared by all server processes, so
+    any pre-forked worker can report on or cancel any job; a heartbeat
+    thread renews this process's job leases and prunes the store. Without
+    one, state lives in this process only and the server must run a
+    single process.
+    """
+
+    def __init__(self, workers: int = 2, max_depth: int = 50, result_ttl: float = 3600, name: str = 'job-worker',
+                 store_path: str = None, lease_ttl: float = 30):
+        """
+        Args:
+            workers: Worker threads running jobs
+            max_depth: Most jobs allowed to wait in the queue
+            result_ttl: Seconds a finished job is kept for polling
+            name: Prefix for worker thread names
+            store_path: sqlite file shared by the server processes, None
+                to keep job state in this process only
+            lease_ttl: Seconds without a heartbeat after which other
+                processes treat this process's unfinished jobs as failed
+        """
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.result_ttl = result_ttl
+        self.name = name
+        self.store = JobStore(store_path, result_ttl, lease_ttl) if store_path else None
+
+        self._condition = threading.Condition()
+        self._counter = itertools.count()
+        self._closed = False
+        self._stopped = threading.Event()  # wakes the heartbeat thread on close()
+        self._threads = ProcessLocal(self._start_workers)
+        self._heap = []  # (-priority, sequence, job)
+        self._jobs = {}  # id -> Job, queued, running and recently finished
+        self._queued = 0
+        self._running = 0
+
+        # Counters for monitoring
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = {SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+
+    def submit(self, func: Callable, *args, priority: int = PRIORITIES['normal'], **kwargs) -> Job:
+        """
+        Queue func(job, *args, **kwargs)
+
+        Returns:
+            The queued Job
+
+        Raises:
+            QueueFullError: If max_depth jobs are already waiting
+        """
+        job = Job(func, args, kwargs, priority)
+        job._store = self.store
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("JobQueue is closed")
+            self._threads.get()
+            self._prune(time.time())
+
+            if self._queued >= self.max_depth:
+                self.rejected += 1
+                raise QueueFullError(f"Job queue is full ({self.max_depth} jobs waiting)")
+
+            job.sequence = next(self._counter)
+            if self.store is not None:
+                # Visible to the other processes before any worker can pick it up
+                self.store.save(job)
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (-priority, job.sequence, job))
+            self._queued += 1
+            self.submitted += 1
+            self._condition.notify()
+
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        The job with this id, or None if unknown or expired
+
+        Jobs owned by another server process are returned as read-only
+        snapshots from the shared store.
+        """
+        with self._condition:
+            self._prune(time.time())
+            job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = self.store.load(job_id)
+        return job
+
+    def position(self, job: Job) -> Optional[int]:
+        """Jobs that will run before a queued job (0 = next), None if it is not queued"""
+        with self._condition:
+            if job.status != QUEUED:
+                return None
+            if self._jobs.get(job.id) is not job:
+                # Snapshot of a job queued in another process
+                return self.store.position(job) if self.store is not None else None
+            key = (-job.priority, job.sequence)
+            return sum(
+                1 for priority, sequence, other in self._heap
+                if other.status == QUEUED and (priority, sequence) < key
+            )
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job
+
+        A queued job is cancelled immediately. A running job is asked to
+        stop and is marked cancelled when it reaches its next
+        check_cancelled() call. Finished jobs are left unchanged.
+
+        Returns:
+            The job, or None if the id is unknown
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return self._cancel_elsewhere(job_id)
+            if job.status in FINISHED_STATES:
+                return job
+
+            job._cancel_requested.set()
+            if self.store is not None:
+                self.store.request_cancel(job_id)
+            if job.status == QUEUED:
+                # Left in the heap; workers skip it when it surfaces
+                self._queued -= 1
+                self._finish(job, CANCELLED)
+            return job
+
+    def _cancel_elsewhere(self, job_id: str) -> Optional[Job]:
+        """Request cancellation of a job owned by another process (caller holds _condition)"""
+        if self.store is None:
+            return None
+        job = self.store.load(job_id)
+        if job is not None and job.status not in FINISHED_STATES:
+            # The owner notices at its next check_cancelled() or when the job surfaces in its queue
+            self.store.request_cancel(job_id)
+            job._cancel_requested.set()
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and job counters for monitoring"""
+        with self._condition:
+            return {
+                "workers": self.workers,
+                "queued": self._queued,
+                "running": self._running,
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "succeeded": self.completed[SUCCEEDED],
+                "failed": self.completed[FAILED],
+                "cancelled": self.completed[CANCELLED]
+            }
+
+    def close(self, cancel_pending: bool = True):
+        """Stop the workers, cancelling queued jobs unless told otherwise"""
+        with self._condition:
+            self._closed = True
+            if cancel_pending:
+                for _, _, job in self._heap:
+                    if job.status == QUEUED:
+                        job._cancel_requested.set()
+                        self._queued -= 1
+                        self._finish(job, CANCELLED)
+            self._condition.notify_all()
+            self._stopped.set()
+            threads = self._threads.peek() or []
+
+        for thread in threads:
+            thread.join()
+
+    def _start_workers(self):
+        """Start the worker threads (and the store heartbeat) of this process"""
+        threads = [
+            threading.Thread(target=self._run, name=f'{self.name}-{index}', daemon=True)
+            for index in range(self.workers)
+        ]
+        if self.store is not None:
+            threads.append(threading.Thread(target=self._heartbeat, name=f'{self.name}-heartbeat', daemon=True))
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _next_job(self):
+        """Block until a queued job is available; None once closed and drained"""
+        with self._condition:
+            while True:
+                while self._heap:
+                    _, _, job = heapq.heappop(self._heap)
+                    if job.status == QUEUED:
+                        self._queued -= 1
+                        if self.store is not None and self.store.cancel_requested(job.id):
+                            # Cancelled through another process while it waited
+                            job._cancel_requested.set()
+                            self._finish(job, CANCELLED)
+                            continue
+                        self._running += 1
+                        job.status = RUNNING
+                        job.started_at = time.time()
+                        if self.store is not None:
+                            self.store.save(job)
+                        return job
+                if self._closed:
+                    return None
+                self._condition.wait()
+
+    def _heartbeat(self):
+        """Renew this process's job leases a few times per lease_ttl and prune the store"""
+        interval = self.store.lease_ttl / 3
+        while not self._stopped.wait(interval):
+            try:
+                now = time.time()
+                self.store.heartbeat(now)
+                self.store.prune(now)
+            except sqlite3.Error as e:
+                print(f"Job store heartbeat failed: {e}")
+
+    def _run(self):
+        """Worker loop: take the highest priority job and run it"""
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+
+            try:
+                job.check_cancelled()
+                result = job.func(job, *job.args, **job.kwargs)
+                outcome = SUCCEEDED
+            except JobCancelled:
+                result, outcome = None, CANCELLED
+            except Exception as e:
+                print(f"Job {job.id} failed: {e}")
+                job.error = str(e)
+                result, outcome = None, FAILED
+
+            with self._condition:
+                self._running -= 1
+                job.result = result
+                self._finish(job, outcome)
+
+    def _finish(self, job, status):
+        """Record a job's final state (caller holds _condition)"""
+        job.status = status
+        job.finished_at = time.time()
+        self.completed[status] += 1
+        # Drop references to the inputs (e.g. upload bytes) once done
+        job.args, job.kwargs = (), {}
+        if self.store is not None:
+            self.store.save(job)
+
+    def _prune(self, now):
+        """Forget jobs that finished more than result_ttl ago (caller holds _condition)"""
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
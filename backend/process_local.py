@@ -0,0 +1,58 @@
+import os
+import threading
+import weakref
+from typing import Any, Callable, Optional
+
+# Every ProcessLocal, so the fork hook can replace their locks in the child
+_instances = weakref.WeakSet()
+
+
+class ProcessLocal:
+    """
+    A resource built lazily, once per process
+
+    Threads, sqlite connections and similar handles do not carry over
+    fork(): a component created before a pre-forking server forks (e.g.
+    `gunicorn --preload`) must rebuild them in each worker. get() calls
+    `factory` the first time it runs in a process and returns that value
+    for the rest of the process's life; whatever the parent built is
+    abandoned, never used or closed in the child.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        """
+        Args:
+            factory: Builds the resource for the calling process
+        """
+        self._factory = factory
+        self._value = None
+        self._pid = None
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def get(self) -> Any:
+        """The calling process's resource, built on first use"""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._value = self._factory()
+                    self._pid = pid
+        return self._value
+
+    def peek(self) -> Optional[Any]:
+        """The calling process's resource if it has been built, else None"""
+        return self._value if self._pid == os.getpid() else None
+
+    def _after_fork(self):
+        """Replace a lock another thread may have held when the process forked"""
+        self._lock = threading.Lock()
+
+
+def _reset_locks_in_child():
+    for instance in list(_instances):
+        instance._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_locks_in_child)
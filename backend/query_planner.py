@@ -0,0 +1,101 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# (site, search term, department) as requested by one recommendation
+Query = Tuple[str, str, Optional[str]]
+
+
+def normalize_term(search_term: str) -> str:
+    """Canonical form of a search term: lower case, single spaces"""
+    return ' '.join(search_term.lower().split())
+
+
+class PlannedQuery:
+    """One unique query of a plan and the recommendations that want its results"""
+
+    __slots__ = ('site', 'term', 'department', 'key', 'wanted_by', 'expected_yield')
+
+    def __init__(self, site: str, term: str, department: Optional[str], key: Tuple[str, str, Optional[str]]):
+        self.site = site
+        self.term = term  # as first requested, since sites see the original spelling
+        self.department = department
+        self.key = key
+        self.wanted_by = []  # (recommendation index, query index within that recommendation)
+        self.expected_yield = 0.0
+
+
+class QueryPlanner:
+    """
+    Deduplicates and orders the product queries of several recommendations
+
+    Recommendations for the same item type share most of their search
+    terms, so one request asks for the same (site, term, department) many
+    times. plan() merges those into one query each, remembering which
+    recommendations wanted it, and orders the unique queries by expected
+    yield: how many recommendations share it times the products its site
+    usually returns. The per-site yield starts from `site_yield` and
+    follows what scrapes actually return (see record()).
+    """
+
+    def __init__(self, site_yield: Dict[str, float], smoothing: float = 0.2):
+        """
+        Args:
+            site_yield: Initial products expected per query, by site
+            smoothing: Weight of each new observation in the running
+                per-site average (0 keeps the initial values)
+        """
+        self.smoothing = smoothing
+        self._site_yield = dict(site_yield)
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.plans = 0
+        self.requested = 0
+        self.planned = 0
+
+    def plan(self, requests: List[List[Query]]) -> List[PlannedQuery]:
+        """
+        Build the query plan for one batch of recommendations
+
+        Args:
+            requests: For each recommendation, its queries in preference order
+
+        Returns:
+            Unique queries, highest expected yield first; ties keep the
+            order in which they were first requested
+        """
+        unique = {}
+        for index, queries in enumerate(requests):
+            for position, (site, term, department) in enumerate(queries):
+                key = (site, normalize_term(term), department)
+                query = unique.get(key)
+                if query is None:
+                    query = unique[key] = PlannedQuery(site, term, department, key)
+                query.wanted_by.append((index, position))
+
+        with self._lock:
+            for query in unique.values():
+                query.expected_yield = len(query.wanted_by) * self._site_yield.get(query.site, 1.0)
+            self.plans += 1
+            self.requested += sum(len(queries) for queries in requests)
+            self.planned += len(unique)
+
+        # sorted() is stable, so equal yields stay in first-requested order
+        return sorted(unique.values(), key=lambda query: query.expected_yield, reverse=True)
+
+    def record(self, site: str, product_count: int):
+        """Fold the number of products a completed query returned into its site's expected yield"""
+        with self._lock:
+            previous = self._site_yield.get(site, float(product_count))
+            self._site_yield[site] = previous + self.smoothing * (product_count - previous)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queries requested vs actually run, and the current per-site yield estimates"""
+        with self._lock:
+            return {
+                "plans": self.plans,
+                "queries_requested": self.requested,
+                "queries_planned": self.planned,
+                "queries_saved": self.requested - self.planned,
+                "site_yield": {site: round(value, 2) for site, value in self._site_yield.items()}
+            }
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Any
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with first-come, first-served reservations
+
+    Tokens refill continuously at `rate` per second up to `burst`. A caller
+    that finds the bucket empty reserves the next token anyway (the balance
+    goes negative) and is told how long to wait for it, so waiters are
+    served in arrival order and nobody can starve.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: Tokens added per second; 0 or less means unlimited
+            burst: Bucket capacity, i.e. requests allowed back to back
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.granted = 0
+        self.total_wait = 0.0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def reserve(self, max_wait: float = None) -> float:
+        """
+        Reserve one token without sleeping
+
+        Args:
+            max_wait: Give up (reserving nothing) if the token would not be
+                available within this many seconds
+
+        Returns:
+            Seconds until the reserved token is available, or -1.0 if
+            max_wait would be exceeded
+        """
+        if self.unlimited:
+            self.granted += 1
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return -1.0
+
+            self._tokens -= 1.0
+            self.granted += 1
+            self.total_wait += wait
+            return wait
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Block until a token is available; False if it would take longer than timeout"""
+        wait = self.reserve(max_wait=timeout)
+        if wait < 0:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now"""
+        return self.reserve(max_wait=0.0) == 0.0
+
+    async def acquire_async(self) -> None:
+        """Wait for a token without blocking the event loop"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class HostRateLimiter:
+    """
+    Independent token buckets per host
+
+    Requests to one site never wait behind another site's budget, while
+    concurrent callers hitting the same site share its budget fairly.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: Requests per second allowed to each host (0 = unlimited)
+            burst: Requests a host may receive back to back
+        """
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay: float, burst: int = 1) -> 'HostRateLimiter':
+        """Limiter allowing one request per `delay` seconds per host"""
+        return cls(1.0 / delay if delay > 0 else 0.0, burst)
+
+    def bucket(self, host: str) -> TokenBucket:
+        """The bucket for a host, created on first use"""
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def reserve(self, host: str, max_wait: float = None) -> float:
+        return self.bucket(host).reserve(max_wait)
+
+    def acquire(self, host: str, timeout: float = None) -> bool:
+        return self.bucket(host).acquire(timeout)
+
+    def try_acquire(self, host: str) -> bool:
+        return self.bucket(host).try_acquire()
+
+    async def acquire_async(self, host: str) -> None:
+        await self.bucket(host).acquire_async()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-host grant counts and accumulated wait time"""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {
+            host: {"granted": bucket.granted, "total_wait_seconds": round(bucket.total_wait, 3)}
+            for host, bucket in buckets.items()
+        }
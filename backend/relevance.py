@@ -0,0 +1,126 @@
+import re
+from typing import Any, Dict, List, Sequence
+
+# Score added when a product title mentions each part of a recommendation
+ITEM_TYPE_WEIGHT = 1.0
+COLOR_WEIGHT = 0.5
+STYLE_TAG_WEIGHT = 0.3
+FORMALITY_WEIGHT = 0.4
+
+# Any one of these words earns FORMALITY_WEIGHT for the formality level
+FORMALITY_WORDS = {
+    'formal': ('business', 'formal', 'dress', 'professional'),
+    'casual': ('casual', 'comfortable', 'relaxed')
+}
+
+# Item types also match their plural: "shirts", "dresses"
+PLURAL_SUFFIX = r'(?:e?s)?'
+
+
+class RelevanceScorer:
+    """
+    Scores product titles against several recommendations in one pass per title
+
+    Every phrase the recommendations care about (item types, colors, style
+    tags, formality words) is compiled into a single alternation regex.
+    Each alternative is wrapped in a lookahead, so the scan tries every
+    position and overlapping phrases are all found. Phrases only match as
+    whole words: "red" does not match "tailored". Item types may also
+    take a plural suffix, so "shirt" is credited in "Dress Shirts". A
+    title's matched phrases are found once and then weighted for each
+    recommendation, so scoring N titles against M recommendations costs N
+    regex scans.
+    """
+
+    def __init__(self, recommendations: Sequence[Dict[str, Any]]):
+        """
+        Args:
+            recommendations: Style recommendations from StyleMatcher
+        """
+        phrases = set()
+        item_types = set()
+
+        # Per recommendation: ([(key, weight), ...] in the original scoring order, formality words).
+        # An item type's key is ('item_type', phrase), since only item types match plurals
+        self._weights = []
+        for recommendation in recommendations:
+            item_type = recommendation.get('item_type', '').lower()
+            entries = [(('item_type', item_type), ITEM_TYPE_WEIGHT)] if item_type else []
+            entries += [(color.lower(), COLOR_WEIGHT) for color in recommendation.get('recommended_colors', [])]
+            entries += [(tag.lower(), STYLE_TAG_WEIGHT) for tag in recommendation.get('style_tags', [])]
+            entries = [(key, weight) for key, weight in entries if key]
+            formality_words = frozenset(FORMALITY_WORDS.get(recommendation.get('formality_level', '').lower(), ()))
+
+            self._weights.append((entries, formality_words))
+            if item_type:
+                item_types.add(item_type)
+            phrases.update(key for key, _ in entries if isinstance(key, str))
+            phrases.update(formality_words)
+
+        # Longest first, so at each position the lookahead captures the longest phrase;
+        # shorter phrases it starts with are credited through _prefixes
+        ordered = sorted(phrases | item_types, key=lambda phrase: (-len(phrase), phrase))
+        self._pattern = None
+        if ordered:
+            alternatives = [re.escape(phrase) + (PLURAL_SUFFIX if phrase in item_types else '') for phrase in ordered]
+            self._pattern = re.compile(r'(?=\b(' + '|'.join(alternatives) + r')\b)')
+
+        # Every text a match can capture -> the keys it credits
+        captures = set(ordered)
+        captures.update(phrase + suffix for phrase in item_types for suffix in ('s', 'es'))
+        self._prefixes = {
+            text: frozenset(
+                [phrase for phrase in phrases if re.match(re.escape(phrase) + r'\b', text)]
+                + [('item_type', phrase) for phrase in item_types
+                   if re.match(re.escape(phrase) + PLURAL_SUFFIX + r'\b', text)]
+            )
+            for text in captures
+        }
+
+        # Titles containing the same phrases score the same; weigh each combination once
+        self._rows = {}
+
+    def matched_phrases(self, title: str) -> frozenset:
+        """Every compiled phrase that occurs in the title as whole words (item types as ('item_type', phrase))"""
+        if self._pattern is None:
+            return frozenset()
+        matched = set()
+        for match in self._pattern.finditer(title.lower()):
+            matched |= self._prefixes[match.group(1)]
+        return frozenset(matched)
+
+    def score_titles(self, titles: Sequence[str]) -> List[List[float]]:
+        """
+        Relevance of each title to each recommendation
+
+        Args:
+            titles: Product titles
+
+        Returns:
+            N x M nested list: one row per title, one score per recommendation
+        """
+        rows = []
+        for title in titles:
+            matched = self.matched_phrases(title)
+            row = self._rows.get(matched)
+            if row is None:
+                row = self._rows[matched] = self._weigh(matched)
+            rows.append(list(row))
+        return rows
+
+    def _weigh(self, matched: frozenset) -> List[float]:
+        """Scores for every recommendation given the phrases a title contains"""
+        row = []
+        for entries, formality_words in self._weights:
+            score = 0.0
+            for key, weight in entries:
+                if key in matched:
+                    score += weight
+            if not formality_words.isdisjoint(matched):
+                score += FORMALITY_WEIGHT
+            row.append(score)
+        return row
+
+    def score(self, title: str, recommendation_index: int = 0) -> float:
+        """Relevance of one title to one of the recommendations"""
+        return self.score_titles([title])[0][recommendation_index]
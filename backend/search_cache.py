@@ -0,0 +1,199 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from process_local import ProcessLocal
+
+
+class SearchCache:
+    """
+    TTL cache for scraped search results with stale-while-revalidate
+
+    - Fresh entries (younger than `ttl`) are served directly.
+    - Stale entries (younger than `ttl + stale_ttl`) are served immediately
+      while one background refresh fetches a new copy.
+    - Misses are single-flight: concurrent lookups of the same key wait on
+      one in-flight load instead of each scraping the page.
+
+    The memory tier is an LRU of `max_entries`; the optional sqlite tier
+    keeps results across restarts; its connection is opened on first use
+    in each process. Cached values are shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(self, ttl: float = 3600, stale_ttl: float = 6 * 3600, max_entries: int = 2048,
+                 disk_path: str = None, cache_empty: bool = False):
+        """
+        Args:
+            ttl: Seconds a result is fresh
+            stale_ttl: Further seconds a result may be served while refreshing
+            max_entries: Memory tier capacity
+            disk_path: sqlite file for the persistent tier, None to disable
+            cache_empty: Also cache empty results (off by default, since an
+                empty page is usually a block or captcha page)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.cache_empty = cache_empty
+
+        self._memory = OrderedDict()  # key -> (stored_at, value)
+        self._inflight = {}  # key -> Future of a running load
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+
+        self.disk_path = disk_path
+        self._db = ProcessLocal(self._open)
+        self._db_lock = threading.Lock()
+
+    def get_or_load(self, key: Tuple[Hashable, ...], loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, calling `loader` when needed
+
+        Exceptions raised by `loader` on a miss propagate to every caller
+        waiting on that load and nothing is cached.
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                stored_at, value = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self.hits += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        self._start_refresh(key, loader)
+                    return value
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        self._load(key, loader, future)
+        return future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "in_flight": len(self._inflight)
+            }
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+        if self.disk_path:
+            with self._db_lock:
+                db = self._connection()
+                db.execute("DELETE FROM search_cache")
+                db.commit()
+
+    def _lookup(self, key):
+        """Memory tier, then disk tier (caller holds _lock)"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+
+        if not self.disk_path:
+            return None
+
+        with self._db_lock:
+            row = self._connection().execute("SELECT stored_at, value FROM search_cache WHERE key = ?", (json.dumps(key),)).fetchone()
+        if row is None:
+            return None
+
+        entry = (row[0], json.loads(row[1]))
+        self._remember(key, entry)
+        return entry
+
+    def _load(self, key, loader, future):
+        """Run a load that this thread owns and publish its outcome"""
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+
+        self._store(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def _start_refresh(self, key, loader):
+        """Revalidate a stale entry in the background (caller holds _lock)"""
+        future = self._inflight[key] = Future()
+        self.refreshes += 1
+        # Nobody waits on a refresh; swallow its exception once it is recorded
+        future.add_done_callback(lambda f: f.exception())
+        threading.Thread(target=self._load, args=(key, loader, future), name='search-cache-refresh', daemon=True).start()
+
+    def _store(self, key, value):
+        """Insert a fresh value into both tiers"""
+        if not value and not self.cache_empty:
+            return
+
+        entry = (time.time(), value)
+        with self._lock:
+            self._remember(key, entry)
+
+        if self.disk_path:
+            with self._db_lock:
+                db = self._connection()
+                db.execute(
+                    "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?)",
+                    (json.dumps(key), entry[0], json.dumps(value))
+                )
+                db.commit()
+
+    def _connection(self):
+        """This process's sqlite connection (caller holds _db_lock)"""
+        return self._db.get()
+
+    def _open(self):
+        """Open the sqlite file and purge results too old to serve even stale"""
+        db = sqlite3.connect(self.disk_path, check_same_thread=False)
+        db.execute("CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, stored_at REAL, value TEXT)")
+        db.execute("DELETE FROM search_cache WHERE stored_at < ?", (time.time() - self.ttl - self.stale_ttl,))
+        db.commit()
+        return db
+
+    def _remember(self, key, entry):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
@@ -1,17 +1,64 @@
+import heapq
 import json
 import os
-from typing import Dict, List, Any
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Any, Iterable, Mapping, Optional, Tuple
 
 class StyleMatcher:
-    def __init__(self):
-        """Initialize the style matcher with fashion rules and preferences"""
-        self.style_rules = self._load_style_rules()
-        self.color_compatibility = self._load_color_compatibility()
+    # Clothing type categories
+    TOPS = frozenset(["shirt", "t-shirt", "blouse", "sweater", "hoodie", "tank_top", "polo", "cardigan"])
+    BOTTOMS = frozenset(["pants", "jeans", "shorts", "skirt", "dress_pants", "chinos", "sweatpants"])
+    OUTERWEAR = frozenset(["jacket", "coat", "blazer", "cardigan", "hoodie"])
+    
+    # General complementary items added for each category
+    TOP_COMPLEMENTS = ("pants", "jeans", "skirt", "shorts")
+    BOTTOM_COMPLEMENTS = ("shirt", "t-shirt", "blouse", "sweater")
+    OUTERWEAR_COMPLEMENTS = ("shirt", "pants", "dress")
+    
+    DEFAULT_COMPATIBLE_COLORS = ("white", "black")
+    
+    # Priority scoring tables
+    HIGH_PRIORITY_PAIRS = frozenset([
+        ("shirt", "pants"), ("pants", "shirt"),
+        ("dress", "shoes"), ("shoes", "dress"),
+        ("suit", "shirt"), ("shirt", "suit")
+    ])
+    ESSENTIAL_ITEMS = frozenset(["shoes", "pants", "shirt", "dress"])
+    
+    # Recommendations returned by find_matches
+    MAX_MATCHES = 10
+    
+    def __init__(self, cache_size: int = 1024):
+        """
+        Initialize the style matcher with fashion rules and preferences
+        
+        Args:
+            cache_size: Recommendation lists memoized by find_matches (0 disables)
+        """
+        # Rules are compiled once into read-only tables; requests only look them up
+        self.style_rules = self._freeze_style_rules(self._load_style_rules())
+        self.color_compatibility = MappingProxyType({
+            color: tuple(compatible) for color, compatible in self._load_color_compatibility().items()
+        })
+        self._complementary_by_category = self._compile_category_complements()
+        self._complementary_types = self._compile_complementary_types()
+        
+        # Memoized recommendations: canonical key -> tuple of match dicts (never handed out)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
         
     def find_matches(self, clothing_analysis: Dict[str, Any], preferences: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         Find clothing items that would match the analyzed piece
         
+        Results are memoized on the fields that affect them; every call
+        returns fresh copies, so callers may modify what they get back.
+        
         Args:
             clothing_analysis: Analysis results from ClothingAnalyzer
             preferences: User preferences (budget, style, brands, etc.)
@@ -19,40 +66,141 @@ class StyleMatcher:
         Returns:
             List of matching clothing recommendations
         """
+        key = self._match_key(clothing_analysis, preferences)
+        return self._copy_matches(self._cached_matches(key, clothing_analysis, preferences))
+    
+    def find_matches_many(self, clothing_analyses: Iterable[Dict[str, Any]],
+                          preferences: Dict[str, Any] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Find matches for several analyzed pieces at once
+        
+        Analyses that only differ in fields find_matches ignores (exact RGB
+        values, confidence, texture, ...) are computed once per call.
+        
+        Args:
+            clothing_analyses: Analysis results from ClothingAnalyzer
+            preferences: User preferences shared by every item
+            
+        Returns:
+            One recommendation list per analysis, in input order
+        """
+        computed = {}
+        results = []
+        for clothing_analysis in clothing_analyses:
+            key = self._match_key(clothing_analysis, preferences)
+            if key not in computed:
+                computed[key] = self._cached_matches(key, clothing_analysis, preferences)
+            results.append(self._copy_matches(computed[key]))
+        return results
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Recommendation cache occupancy and hit counters"""
+        with self._cache_lock:
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.cache_size,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses
+            }
+    
+    def _match_key(self, clothing_analysis: Dict[str, Any], preferences: Optional[Dict[str, Any]]) -> Tuple:
+        """Canonical key of everything find_matches output depends on"""
+        # Only the names of the top three colors are used, not their RGB/hex values
+        colors = tuple(
+            color_info.get('name', 'white')
+            for color_info in clothing_analysis.get('dominant_colors', [])[:3]
+        )
+        return (
+            clothing_analysis.get('clothing_type', 'unknown'),
+            clothing_analysis.get('formality_level', 'casual'),
+            self._canonical_season(clothing_analysis),
+            colors,
+            json.dumps(preferences or {}, sort_keys=True, default=str)
+        )
+    
+    def _canonical_season(self, clothing_analysis: Dict[str, Any]) -> Tuple[str, ...]:
+        """season_suitability as a tuple of strings, whatever shape the caller sent"""
+        season = clothing_analysis.get('season_suitability', ['spring', 'fall'])
+        if isinstance(season, str):
+            return (season,)
+        if isinstance(season, (list, tuple)):
+            return tuple(str(value) for value in season)
+        if isinstance(season, (set, frozenset, dict)):
+            return tuple(sorted(str(value) for value in season))
+        return (str(season),)
+    
+    def _cached_matches(self, key: Tuple, clothing_analysis: Dict[str, Any],
+                        preferences: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], ...]:
+        """Memoized recommendations for a key, computed on a miss"""
+        if self.cache_size <= 0:
+            return tuple(self._build_matches(clothing_analysis, preferences))
+        
+        with self._cache_lock:
+            matches = self._cache.get(key)
+            if matches is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return matches
+            self.cache_misses += 1
+        
+        # Built outside the lock; concurrent misses for one key just both compute it
+        matches = tuple(self._build_matches(clothing_analysis, preferences))
+        with self._cache_lock:
+            self._cache[key] = matches
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return matches
+    
+    def _copy_matches(self, matches: Tuple[Dict[str, Any], ...]) -> List[Dict[str, Any]]:
+        """Caller-owned copies of cached match dicts and their list values"""
+        return [
+            {field: list(value) if isinstance(value, list) else value for field, value in match.items()}
+            for match in matches
+        ]
+    
+    def _build_matches(self, clothing_analysis: Dict[str, Any], preferences: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Compute the top recommendations for an analyzed piece"""
         if preferences is None:
             preferences = {}
             
         clothing_type = clothing_analysis.get('clothing_type', 'unknown')
         colors = clothing_analysis.get('dominant_colors', [])
         formality = clothing_analysis.get('formality_level', 'casual')
-        season = clothing_analysis.get('season_suitability', ['spring', 'fall'])
+        # Canonical copy: the caller's own list must not end up inside the cache
+        season = self._canonical_season(clothing_analysis)
         
-        matches = []
-        
-        # Get complementary clothing types
+        # Get complementary clothing types and the color schemes to pair them with
         complementary_types = self._get_complementary_types(clothing_type, formality)
+        match_colors = self._get_matching_colors(colors)
         
-        # Generate matches for each complementary type
-        for comp_type in complementary_types:
-            match_colors = self._get_matching_colors(colors)
-            
-            for color_scheme in match_colors:
-                match = {
-                    "item_type": comp_type,
-                    "recommended_colors": color_scheme,
-                    "formality_level": formality,
-                    "season": season,
-                    "style_tags": self._generate_style_tags(comp_type, formality, color_scheme),
-                    "search_terms": self._generate_search_terms(comp_type, color_scheme, formality),
-                    "priority": self._calculate_priority(comp_type, clothing_type, formality),
-                    "outfit_type": self._determine_outfit_type(clothing_type, comp_type, formality)
-                }
-                
-                matches.append(match)
-        
-        # Sort by priority and return top matches
-        matches.sort(key=lambda x: x['priority'], reverse=True)
-        return matches[:10]  # Return top 10 matches
+        # Score every (type, scheme) candidate as a cheap tuple. Priority only
+        # depends on the type, and ties keep type-then-scheme order.
+        priorities = [self._calculate_priority(comp_type, clothing_type, formality) for comp_type in complementary_types]
+        candidates = (
+            (-priority, type_index, scheme_index)
+            for type_index, priority in enumerate(priorities)
+            for scheme_index in range(len(match_colors))
+        )
+        winners = heapq.nsmallest(self.MAX_MATCHES, candidates)
+        
+        # Build the full match dicts for the winners only
+        matches = []
+        for negative_priority, type_index, scheme_index in winners:
+            comp_type = complementary_types[type_index]
+            color_scheme = list(match_colors[scheme_index])
+            matches.append({
+                "item_type": comp_type,
+                "recommended_colors": color_scheme,
+                "formality_level": formality,
+                "season": list(season),
+                "style_tags": self._generate_style_tags(comp_type, formality, color_scheme),
+                "search_terms": self._generate_search_terms(comp_type, color_scheme, formality),
+                "priority": -negative_priority,
+                "outfit_type": self._determine_outfit_type(clothing_type, comp_type, formality)
+            })
+        
+        return matches
     
     def _load_style_rules(self) -> Dict[str, Any]:
         """Load fashion style rules"""
@@ -96,24 +244,49 @@ class StyleMatcher:
             "navy": ["white", "yellow", "red", "orange", "pink"]
         }
     
-    def _get_complementary_types(self, clothing_type: str, formality: str) -> List[str]:
-        """Get clothing types that complement the given item"""
-        rules = self.style_rules.get(formality, {})
-        complementary = rules.get(clothing_type, [])
-        
-        # Add general complementary items based on clothing type category
+    def _freeze_style_rules(self, rules: Dict[str, Any]) -> Mapping[str, Mapping[str, Tuple[str, ...]]]:
+        """Read-only copy of the style rules with tuple values"""
+        return MappingProxyType({
+            formality: MappingProxyType({clothing_type: tuple(items) for clothing_type, items in types.items()})
+            for formality, types in rules.items()
+        })
+    
+    def _category_complements(self, clothing_type: str) -> Tuple[str, ...]:
+        """General complementary items for the clothing type's category"""
         if self._is_top(clothing_type):
-            complementary.extend(["pants", "jeans", "skirt", "shorts"])
+            return self.TOP_COMPLEMENTS
         elif self._is_bottom(clothing_type):
-            complementary.extend(["shirt", "t-shirt", "blouse", "sweater"])
+            return self.BOTTOM_COMPLEMENTS
         elif self._is_outerwear(clothing_type):
-            complementary.extend(["shirt", "pants", "dress"])
-        
-        # Remove duplicates and the original item
-        complementary = list(set(complementary))
-        if clothing_type in complementary:
-            complementary.remove(clothing_type)
-            
+            return self.OUTERWEAR_COMPLEMENTS
+        return ()
+    
+    def _combine_complements(self, clothing_type: str, items: Tuple[str, ...]) -> Tuple[str, ...]:
+        """Rule items followed by category items, deduplicated in order, without the item itself"""
+        combined = dict.fromkeys(items + self._category_complements(clothing_type))
+        combined.pop(clothing_type, None)
+        return tuple(combined)
+    
+    def _compile_category_complements(self) -> Mapping[str, Tuple[str, ...]]:
+        """Complementary types for categorized items without a formality rule"""
+        return MappingProxyType({
+            clothing_type: self._combine_complements(clothing_type, ())
+            for clothing_type in self.TOPS | self.BOTTOMS | self.OUTERWEAR
+        })
+    
+    def _compile_complementary_types(self) -> Mapping[Tuple[str, str], Tuple[str, ...]]:
+        """Complementary types for every (clothing type, formality) with a rule"""
+        return MappingProxyType({
+            (clothing_type, formality): self._combine_complements(clothing_type, items)
+            for formality, types in self.style_rules.items()
+            for clothing_type, items in types.items()
+        })
+    
+    def _get_complementary_types(self, clothing_type: str, formality: str) -> Tuple[str, ...]:
+        """Get clothing types that complement the given item"""
+        complementary = self._complementary_types.get((clothing_type, formality))
+        if complementary is None:
+            complementary = self._complementary_by_category.get(clothing_type, ())
         return complementary
     
     def _get_matching_colors(self, input_colors: List[Dict[str, Any]]) -> List[List[str]]:
@@ -125,11 +298,11 @@ class StyleMatcher:
         
         for color_info in input_colors[:3]:  # Process top 3 colors
             color_name = color_info.get('name', 'white')
-            compatible_colors = self.color_compatibility.get(color_name, ["white", "black"])
+            compatible_colors = self.color_compatibility.get(color_name, self.DEFAULT_COMPATIBLE_COLORS)
             
             # Create color schemes
             matching_schemes.append([color_name])  # Monochromatic
-            matching_schemes.append(compatible_colors[:2])  # Complementary
+            matching_schemes.append(list(compatible_colors[:2]))  # Complementary
             
         # Add neutral schemes
         matching_schemes.extend([
@@ -159,7 +332,8 @@ class StyleMatcher:
         # Add seasonal tags
         tags.extend(["spring", "summer", "fall", "winter"])
         
-        return list(set(tags))
+        # Deduplicate keeping first occurrences, so tags are ordered the same in every process
+        return list(dict.fromkeys(tags))
     
     def _generate_search_terms(self, item_type: str, colors: List[str], formality: str) -> List[str]:
         """Generate search terms for web scraping"""
@@ -198,13 +372,7 @@ class StyleMatcher:
         base_score = 1.0
         
         # High priority pairs
-        high_priority_pairs = [
-            ("shirt", "pants"), ("pants", "shirt"),
-            ("dress", "shoes"), ("shoes", "dress"),
-            ("suit", "shirt"), ("shirt", "suit")
-        ]
-        
-        if (original_type, comp_type) in high_priority_pairs:
+        if (original_type, comp_type) in self.HIGH_PRIORITY_PAIRS:
             base_score += 0.5
         
         # Formality bonus
@@ -214,8 +382,7 @@ class StyleMatcher:
             base_score += 0.2
         
         # Essential items bonus
-        essential_items = ["shoes", "pants", "shirt", "dress"]
-        if comp_type in essential_items:
+        if comp_type in self.ESSENTIAL_ITEMS:
             base_score += 0.2
         
         return base_score
@@ -234,15 +401,12 @@ class StyleMatcher:
     
     def _is_top(self, clothing_type: str) -> bool:
         """Check if the clothing type is a top"""
-        tops = ["shirt", "t-shirt", "blouse", "sweater", "hoodie", "tank_top", "polo", "cardigan"]
-        return clothing_type in tops
+        return clothing_type in self.TOPS
     
     def _is_bottom(self, clothing_type: str) -> bool:
         """Check if the clothing type is a bottom"""
-        bottoms = ["pants", "jeans", "shorts", "skirt", "dress_pants", "chinos", "sweatpants"]
-        return clothing_type in bottoms
+        return clothing_type in self.BOTTOMS
     
     def _is_outerwear(self, clothing_type: str) -> bool:
         """Check if the clothing type is outerwear"""
-        outerwear = ["jacket", "coat", "blazer", "cardigan", "hoodie"]
-        return clothing_type in outerwear
+        return clothing_type in self.OUTERWEAR
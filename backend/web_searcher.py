@@ -1,19 +1,37 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+import email.utils
 import json
+import threading
 import time
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import urllib.parse
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import re
+from config import Config
+from browser_pool import BrowserPool, chrome_driver_factory
+from html_parsers import LxmlResultParser, create_parser
+from query_planner import PlannedQuery, Query, QueryPlanner, normalize_term
+from relevance import RelevanceScorer
+from rate_limiter import HostRateLimiter
+from search_cache import SearchCache
 
 class WebSearcher:
-    def __init__(self):
-        """Initialize web searcher with supported shopping sites"""
+    def __init__(self, max_workers: int = None, max_per_host: int = None, parser_backend: str = None,
+                 streaming: bool = None):
+        """
+        Initialize web searcher with supported shopping sites
+        
+        Args:
+            max_workers: Size of the shared search thread pool (default Config.SEARCH_WORKERS)
+            max_per_host: Concurrent requests allowed per host (default Config.SEARCH_MAX_PER_HOST)
+            parser_backend: HTML parser for result pages (default Config.HTML_PARSER)
+            streaming: Parse pages while they download and stop once enough
+                products are found (default Config.SEARCH_STREAMING). Only
+                lxml parses incrementally, so it is ignored unless
+                parser_backend is (or 'auto' resolves to) lxml.
+        """
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -24,11 +42,12 @@ class WebSearcher:
                 'url': 'https://www.amazon.com/s',
                 'params': {'k': '', 'ref': 'sr_pg_1'},
                 'selectors': {
-                    'products': '[data-component-type="s-search-result"]',
+                    'products': 'div[data-component-type="s-search-result"]',
                     'title': 'h2 a span',
                     'price': '.a-price-whole',
                     'image': '.s-image',
-                    'link': 'h2 a'
+                    'link': 'h2 a',
+                    'rating': '.a-icon-alt'
                 }
             },
             'zappos': {
@@ -41,12 +60,71 @@ class WebSearcher:
                     'image': 'img',
                     'link': 'a'
                 }
+            },
+            'google_shopping': {
+                'url': 'https://www.google.com/search',
+                'params': {'q': '', 'tbm': 'shop'},
+                'selectors': {
+                    'products': 'div.sh-dgr__content',
+                    'title': 'h3',
+                    'price': 'span'
+                },
+                # The price is the first span that looks like one
+                'text_patterns': {'price': r'\$\d+'}
             }
         }
         
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_delay = 1  # Minimum 1 second between requests
+        # Result page parsers, selectors compiled once per site
+        self.parser_backend = parser_backend or Config.HTML_PARSER
+        self.parsers = {
+            site: create_parser(info['selectors'], self.parser_backend, info.get('text_patterns'))
+            for site, info in self.shopping_sites.items()
+        }
+        
+        # Streaming fetches parse with lxml's incremental parser, so they are
+        # only used when lxml is the selected backend; a faster backend
+        # (selectolax) downloads whole pages and parses them itself
+        if streaming is None:
+            streaming = Config.SEARCH_STREAMING
+        self.streaming = streaming and all(isinstance(parser, LxmlResultParser) for parser in self.parsers.values())
+        self.stream_chunk_size = Config.SEARCH_STREAM_CHUNK_SIZE
+        self._stream_stats = {'pages': 0, 'early_exits': 0, 'bytes_read': 0}
+        self._stream_stats_lock = threading.Lock()
+        
+        # Rate limiting: an independent token bucket per host
+        self.rate_limiter = HostRateLimiter.from_delay(Config.REQUEST_DELAY, burst=Config.RATE_LIMIT_BURST)
+        
+        # Concurrent fan-out: one shared pool, bounded per host
+        self.request_timeout = 10
+        self.max_per_host = max_per_host or Config.SEARCH_MAX_PER_HOST
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.SEARCH_WORKERS,
+            thread_name_prefix='web-search'
+        )
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # Scraped results cache, keyed by (site, normalized term, department)
+        self.search_cache = None
+        if Config.SEARCH_CACHE_SIZE > 0:
+            self.search_cache = SearchCache(
+                ttl=Config.SEARCH_CACHE_TTL,
+                stale_ttl=Config.SEARCH_CACHE_STALE_TTL,
+                max_entries=Config.SEARCH_CACHE_SIZE,
+                disk_path=Config.SEARCH_CACHE_PATH or None
+            )
+        
+        # Merges the identical queries of a request's recommendations; seeded
+        # with the products kept per results page of each site
+        self.query_planner = QueryPlanner({'amazon': 10, 'google_shopping': 5})
+        
+        # Pooled keep-alive sessions, one per host
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        
+        # Warm headless browsers for search_with_selenium, launched on demand
+        self._browser_pool = None
+        self._browser_pool_lock = threading.Lock()
         
     def search_products(self, recommendation: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -58,187 +136,436 @@ class WebSearcher:
         Returns:
             List of product information dictionaries
         """
-        search_terms = recommendation.get('search_terms', [])
-        item_type = recommendation.get('item_type', '')
+        return self.search_products_many([recommendation])[0]
+    
+    def search_products_many(self, recommendations: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Search for products for several recommendations at once
+        
+        The queries of all recommendations are planned together: identical
+        (site, term, department) queries run once and their products are
+        scored separately for every recommendation that asked for them.
+        Queries run in two waves: every Amazon query first, then Google
+        Shopping for the terms whose Amazon results came back short (see
+        _fallback_tasks). Each wave's unique queries are submitted to the
+        shared thread pool up front, so the round trips overlap instead of
+        running back to back. Per-host limits keep each site's load bounded.
+        
+        Args:
+            recommendations: Style recommendations from StyleMatcher
+            
+        Returns:
+            One product list per recommendation, in the same order
+        """
+        scorer = RelevanceScorer(recommendations)
+        
+        # Each recommendation's batches, kept in its own query order so results stay deterministic
+        batches = [{} for _ in recommendations]
+        self._run_wave([self._search_tasks(recommendation) for recommendation in recommendations], scorer, batches)
+        self._run_wave([
+            self._fallback_tasks(recommendation, {position: len(products) for position, products in found.items()})
+            for recommendation, found in zip(recommendations, batches)
+        ], scorer, batches)
+        
+        results = []
+        for recommendation, found in zip(recommendations, batches):
+            all_products = [product for position in sorted(found) for product in found[position]]
+            results.append(self.rank_products(all_products, recommendation))
+        
+        return results
+    
+    def iter_search_products(self, recommendations: List[Dict[str, Any]]) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+        """
+        Search for products for several recommendations, yielding results as they arrive
+        
+        Queries are planned and submitted in the same two waves as
+        search_products_many, but each one's products are yielded as soon
+        as that query finishes, once per recommendation that wanted it, so
+        callers can show partial results while slower sites are still
+        being scraped. Passing a recommendation's batches, ordered by query
+        index, to rank_products() gives the same list search_products_many
+        would return.
+        
+        Args:
+            recommendations: Style recommendations from StyleMatcher
+            
+        Yields:
+            (index of the recommendation, index of the query within it,
+            relevance-scored products of that query) in completion order;
+            queries that fail or find nothing yield nothing
+        """
+        scorer = RelevanceScorer(recommendations)
         
-        all_products = []
+        # Products found per (recommendation, query index), for choosing the fallback queries
+        found = [{} for _ in recommendations]
+        first_wave = [self._search_tasks(recommendation) for recommendation in recommendations]
+        for index, position, scored in self._iter_wave(first_wave, scorer):
+            found[index][position] = len(scored)
+            yield index, position, scored
         
-        # Search with multiple terms
-        for term in search_terms[:3]:  # Limit to first 3 terms to avoid overwhelming
+        yield from self._iter_wave([
+            self._fallback_tasks(recommendation, counts) for recommendation, counts in zip(recommendations, found)
+        ], scorer)
+    
+    def _run_wave(self, tasks: List[List[Tuple[int, Query]]], scorer: RelevanceScorer,
+                  batches: List[Dict[int, List[Dict[str, Any]]]]):
+        """Run one wave of queries and file each one's scored products under its owners' query indexes"""
+        if not any(tasks):
+            return
+        plan, futures = self._submit_searches(tasks)
+        for query, future in zip(plan, futures):
             try:
-                # Add delay for rate limiting
-                self._rate_limit()
-                
-                # Search Amazon (most reliable)
-                amazon_products = self._search_amazon(term, recommendation)
-                all_products.extend(amazon_products)
-                
-                # Search other sites if needed
-                if len(all_products) < 10:
-                    # Add delay between different sites
-                    self._rate_limit()
-                    other_products = self._search_general_sites(term, recommendation)
-                    all_products.extend(other_products)
-                
+                products = future.result()
             except Exception as e:
-                print(f"Error searching for {term}: {e}")
+                print(f"Error searching for products: {e}")
                 continue
+            for (index, position), scored in self._score_for_owners(products, query, scorer):
+                batches[index][position] = scored
+    
+    def _iter_wave(self, tasks: List[List[Tuple[int, Query]]],
+                   scorer: RelevanceScorer) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+        """Run one wave of queries, yielding (recommendation, query index, products) in completion order"""
+        if not any(tasks):
+            return
+        plan, futures = self._submit_searches(tasks)
+        owners = dict(zip(futures, plan))
         
+        try:
+            for future in as_completed(owners):
+                try:
+                    products = future.result()
+                except Exception as e:
+                    print(f"Error searching for products: {e}")
+                    continue
+                if products:
+                    for (index, position), scored in self._score_for_owners(products, owners[future], scorer):
+                        yield index, position, scored
+        finally:
+            # The caller stopped early (e.g. a cancelled job): drop queries not yet started
+            for future in owners:
+                future.cancel()
+    
+    def rank_products(self, products: List[Dict[str, Any]], recommendation: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Deduplicate one recommendation's products and keep the 20 most relevant"""
         # Remove duplicates and sort by relevance
-        unique_products = self._remove_duplicates(all_products)
+        unique_products = self._remove_duplicates(products)
         sorted_products = self._sort_by_relevance(unique_products, recommendation)
-        
         return sorted_products[:20]  # Return top 20 products
     
-    def _search_amazon(self, search_term: str, recommendation: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Search Amazon for products"""
-        try:
-            # Prepare search URL
-            base_url = "https://www.amazon.com/s"
-            params = {
-                'k': search_term,
-                'ref': 'sr_pg_1'
-            }
-            
-            # Add department filter if possible
-            item_type = recommendation.get('item_type', '')
-            if item_type in ['shirt', 't-shirt', 'blouse']:
-                params['i'] = 'fashion-mens'  # or fashion-womens
-            
-            url = f"{base_url}?{urllib.parse.urlencode(params)}"
-            
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products = []
-            
-            # Find product containers
-            product_containers = soup.find_all('div', {'data-component-type': 's-search-result'})
-            
-            for container in product_containers[:10]:  # Limit to first 10 results
+    def plan_stats(self) -> Dict[str, Any]:
+        """Query planner counters: queries requested vs actually run"""
+        return self.query_planner.stats()
+    
+    def _submit_searches(self, tasks: List[List[Tuple[int, Query]]]) -> Tuple[List[PlannedQuery], List[Future]]:
+        """Plan one wave of (query index, query) tasks per recommendation and start each unique query on the shared pool"""
+        plan = self.query_planner.plan([[query for _, query in wave] for wave in tasks])
+        for query in plan:
+            # The planner numbers queries within this wave; owners want the index across both waves
+            query.wanted_by = [(index, tasks[index][slot][0]) for index, slot in query.wanted_by]
+        
+        # Fan out every query, highest expected yield first, before waiting on any of them
+        return plan, [self._executor.submit(self._run_query, query) for query in plan]
+    
+    def _search_tasks(self, recommendation: Dict[str, Any]) -> List[Tuple[int, Query]]:
+        """
+        First wave for one recommendation: an Amazon query per search term
+        
+        Query indexes interleave with the fallback wave (term k's Amazon
+        query is 2k, its Google Shopping query 2k + 1), so results keep
+        the original amazon, google, amazon, ... order.
+        """
+        search_terms = recommendation.get('search_terms', [])
+        department = self._amazon_department(recommendation.get('item_type', ''))
+        
+        # Limit to first 3 terms to avoid overwhelming; Amazon is the most reliable
+        return [(2 * k, ('amazon', term, department)) for k, term in enumerate(search_terms[:3])]
+    
+    def _fallback_tasks(self, recommendation: Dict[str, Any], found: Dict[int, int]) -> List[Tuple[int, Query]]:
+        """
+        Second wave for one recommendation: Google Shopping for the terms Amazon came back short on
+        
+        As in the sequential search this replaces, a term also searches
+        the other sites while fewer than 10 products have been found by
+        the Amazon queries up to and including it. Fallback products of
+        earlier terms are not counted, since that wave runs concurrently.
+        
+        Args:
+            recommendation: Style recommendation from StyleMatcher
+            found: Products returned per first-wave query index
+        """
+        tasks = []
+        total = 0
+        for k, term in enumerate(recommendation.get('search_terms', [])[:3]):
+            total += found.get(2 * k, 0)
+            if total < 10:
+                tasks.append((2 * k + 1, ('google_shopping', term, None)))  # Google Shopping covers other sites
+        return tasks
+    
+    def _amazon_department(self, item_type: str) -> Optional[str]:
+        """Amazon department filter for an item type, if any"""
+        if item_type in ['shirt', 't-shirt', 'blouse']:
+            return 'fashion-mens'  # or fashion-womens
+        return None
+    
+    @contextmanager
+    def _request(self, url: str, stream: bool = False):
+        """
+        GET a search page, holding one of its host's concurrency slots until the body is read
+        
+        429/503 answers are retried up to HTTP_RETRIES times. Every attempt
+        waits for the host's rate budget and takes a slot again like a new
+        request, and the slot is given up while backing off.
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        
+        for attempt in range(Config.HTTP_RETRIES + 1):
+            # Wait for this host's rate budget before taking a concurrency slot
+            self.rate_limiter.acquire(host)
+            with self._host_slot(host):
+                response = self._session(host).get(url, timeout=self.request_timeout, stream=stream)
+                delay = None
+                if response.status_code in (429, 503) and attempt < Config.HTTP_RETRIES:
+                    delay = self._retry_delay(host, response, attempt)
+                
+                if delay is None:
+                    try:
+                        response.raise_for_status()
+                        yield response
+                    finally:
+                        response.close()
+                    return
+                response.close()
+            time.sleep(delay)
+    
+    def _retry_delay(self, host: str, response: requests.Response, attempt: int) -> Optional[float]:
+        """
+        Seconds to back off before retrying a throttled request, None to give up
+        
+        Exponential backoff from HTTP_RETRY_BACKOFF, but never shorter than
+        the host's Retry-After or its rate limiter's refill interval. A
+        Retry-After longer than the request timeout is not waited for.
+        """
+        delay = Config.HTTP_RETRY_BACKOFF * (2 ** attempt)
+        
+        bucket = self.rate_limiter.bucket(host)
+        if not bucket.unlimited:
+            delay = max(delay, 1.0 / bucket.rate)
+        
+        retry_after = response.headers.get('Retry-After', '').strip()
+        if retry_after:
+            if retry_after.isdigit():
+                seconds = float(retry_after)
+            else:
                 try:
-                    # Extract product information
-                    title_elem = container.find('h2')
-                    if title_elem:
-                        title_link = title_elem.find('a')
-                        title = title_link.find('span').get_text(strip=True) if title_link and title_link.find('span') else 'N/A'
-                        product_url = 'https://amazon.com' + title_link.get('href') if title_link else ''
-                    else:
-                        continue
-                    
-                    # Extract price
-                    price_elem = container.find('span', class_='a-price-whole')
-                    price = price_elem.get_text(strip=True) if price_elem else 'N/A'
-                    
-                    # Extract image
-                    img_elem = container.find('img', class_='s-image')
-                    image_url = img_elem.get('src') if img_elem else ''
-                    
-                    # Extract rating
-                    rating_elem = container.find('span', class_='a-icon-alt')
-                    rating = rating_elem.get_text(strip=True).split()[0] if rating_elem else 'N/A'
-                    
-                    product = {
-                        'title': title,
-                        'price': price,
-                        'url': product_url,
-                        'image_url': image_url,
-                        'rating': rating,
-                        'source': 'Amazon',
-                        'relevance_score': self._calculate_relevance(title, recommendation),
-                        'search_term': search_term
-                    }
-                    
-                    products.append(product)
-                    
-                except Exception as e:
-                    print(f"Error parsing Amazon product: {e}")
-                    continue
+                    seconds = email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    seconds = 0.0
+            if seconds > self.request_timeout:
+                return None
+            delay = max(delay, seconds)
+        
+        return delay
+    
+    def _fetch_results(self, site: str, url: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Fetch a results page and extract the fields of its first `limit` products
+        
+        In streaming mode the body is parsed chunk by chunk and the download
+        is abandoned once `limit` products are complete, so the long tail of
+        the page is never transferred. The cut-short connection is dropped
+        rather than returned to the pool.
+        """
+        if not self.streaming:
+            with self._request(url) as response:
+                return self.parsers[site].parse(response.content, limit=limit)
+        
+        with self._request(url, stream=True) as response:
+            progress = {'bytes': 0, 'finished': False}
             
-            return products
+            def chunks():
+                for chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+                    progress['bytes'] += len(chunk)
+                    yield chunk
+                progress['finished'] = True
             
+            results = self.parsers[site].parse_stream(
+                chunks(), limit=limit, encoding=self._declared_charset(response)
+            )
+        
+        with self._stream_stats_lock:
+            self._stream_stats['pages'] += 1
+            self._stream_stats['bytes_read'] += progress['bytes']
+            if not progress['finished']:
+                self._stream_stats['early_exits'] += 1
+        return results
+    
+    def _declared_charset(self, response: requests.Response) -> Optional[str]:
+        """Charset named in the Content-Type header, None to let the parser sniff it"""
+        # Without one, requests reports ISO-8859-1 (the HTTP default), which
+        # would garble UTF-8 pages; lxml reads the <meta> charset instead
+        if 'charset' in response.headers.get('content-type', '').lower():
+            return response.encoding
+        return None
+    
+    def stream_stats(self) -> Dict[str, Any]:
+        """Pages fetched in streaming mode, how many stopped early and bytes actually read"""
+        with self._stream_stats_lock:
+            return dict(self._stream_stats, enabled=self.streaming)
+    
+    def _session(self, host: str) -> requests.Session:
+        """
+        Keep-alive session for one host
+        
+        Its connection pool holds as many connections as the host may have
+        requests in flight, so connections are reused rather than reopened.
+        Responses may be compressed with any encoding urllib3 can decode
+        (gzip/deflate, plus br when the brotli package is installed).
+        Retries are left to _request so they go through the rate limiter.
+        """
+        with self._sessions_lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                session.headers['Accept-Encoding'] = make_headers(accept_encoding=True)['accept-encoding']
+                session.headers['Connection'] = 'keep-alive'
+                
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_per_host, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                
+                self._sessions[host] = session
+            return self._sessions[host]
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connections opened vs reused per host, to check keep-alive under load"""
+        stats = {}
+        with self._sessions_lock:
+            sessions = dict(self._sessions)
+        
+        for host, session in sessions.items():
+            opened = requests_sent = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is not None:
+                        opened += pool.num_connections
+                        requests_sent += pool.num_requests
+            stats[host] = {
+                "connections_opened": opened,
+                "requests": requests_sent,
+                "connections_reused": max(0, requests_sent - opened)
+            }
+        return stats
+    
+    def close(self):
+        """Close pooled connections and browsers and stop the search threads"""
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        self._executor.shutdown(wait=False)
+        
+        with self._browser_pool_lock:
+            if self._browser_pool is not None:
+                self._browser_pool.close()
+    
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        """Semaphore bounding concurrent requests to one host"""
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+    
+    def _run_query(self, query: PlannedQuery) -> List[Dict[str, Any]]:
+        """Unscored products for one planned query ([] if the site fails)"""
+        if query.site == 'amazon':
+            scrape = lambda: self._scrape_amazon(query.term, query.department)
+        else:
+            scrape = lambda: self._scrape_google_shopping(query.term)
+        
+        try:
+            products = self._cached_search(query.site, query.term, query.department, scrape)
         except Exception as e:
-            print(f"Error searching Amazon: {e}")
+            print(f"Error searching {query.site}: {e}")
             return []
+        
+        self.query_planner.record(query.site, len(products))
+        return products
     
-    def _search_general_sites(self, search_term: str, recommendation: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Search other shopping sites using a general approach"""
-        products = []
+    def _cached_search(self, site: str, search_term: str, department: str, scrape) -> List[Dict[str, Any]]:
+        """Scraped results for one query, served from the search cache when possible"""
+        if self.search_cache is None:
+            return scrape()
         
-        # Use Google Shopping search as a fallback
-        try:
-            google_url = f"https://www.google.com/search?q={urllib.parse.quote(search_term + ' shopping')}&tbm=shop"
-            
-            response = requests.get(google_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Parse Google Shopping results (simplified)
-            shopping_results = soup.find_all('div', class_='sh-dgr__content')
+        key = (site, self._normalize_term(search_term), department)
+        return self.search_cache.get_or_load(key, scrape)
+    
+    def _normalize_term(self, search_term: str) -> str:
+        """Canonical form of a search term for cache keys"""
+        return normalize_term(search_term)
+    
+    def _score_for_owners(self, products: List[Dict[str, Any]], query: PlannedQuery,
+                          scorer: RelevanceScorer) -> List[Tuple[Tuple[int, int], List[Dict[str, Any]]]]:
+        """Products of one query scored for every recommendation that wanted it, in one pass over the titles"""
+        scores = scorer.score_titles([product['title'] for product in products])
+        return [
+            ((index, position), [dict(product, relevance_score=row[index]) for product, row in zip(products, scores)])
+            for index, position in query.wanted_by
+        ]
+    
+    def _scrape_amazon(self, search_term: str, department: str = None) -> List[Dict[str, Any]]:
+        """Fetch and parse an Amazon results page (raises if the fetch fails)"""
+        # Prepare search URL
+        base_url = self.shopping_sites['amazon']['url']
+        params = {
+            'k': search_term,
+            'ref': 'sr_pg_1'
+        }
+        if department:
+            params['i'] = department
+        
+        url = f"{base_url}?{urllib.parse.urlencode(params)}"
+        
+        products = []
+        for fields in self._fetch_results('amazon', url, limit=10):  # Limit to first 10 results
+            if not fields['title']:
+                continue
             
-            for result in shopping_results[:5]:  # Limit results
-                try:
-                    # Extract basic information (this is a simplified approach)
-                    title_elem = result.find('h3')
-                    title = title_elem.get_text(strip=True) if title_elem else 'N/A'
-                    
-                    # Try to find price
-                    price_elem = result.find('span', text=re.compile(r'\$\d+'))
-                    price = price_elem.get_text(strip=True) if price_elem else 'N/A'
-                    
-                    product = {
-                        'title': title,
-                        'price': price,
-                        'url': '',  # Google Shopping doesn't provide direct links easily
-                        'image_url': '',
-                        'rating': 'N/A',
-                        'source': 'Google Shopping',
-                        'relevance_score': self._calculate_relevance(title, recommendation),
-                        'search_term': search_term
-                    }
-                    
-                    products.append(product)
-                    
-                except Exception as e:
-                    continue
+            product = {
+                'title': fields['title'],
+                'price': fields['price'] or 'N/A',
+                'url': 'https://amazon.com' + fields['link'] if fields['link'] else '',
+                'image_url': fields['image'] or '',
+                'rating': fields['rating'].split()[0] if fields['rating'] else 'N/A',
+                'source': 'Amazon',
+                'search_term': search_term
+            }
             
-        except Exception as e:
-            print(f"Error searching general sites: {e}")
+            products.append(product)
         
         return products
     
-    def _calculate_relevance(self, title: str, recommendation: Dict[str, Any]) -> float:
-        """Calculate how relevant a product is to the recommendation"""
-        score = 0.0
-        title_lower = title.lower()
-        
-        # Check for item type match
-        item_type = recommendation.get('item_type', '').lower()
-        if item_type in title_lower:
-            score += 1.0
-        
-        # Check for color matches
-        recommended_colors = recommendation.get('recommended_colors', [])
-        for color in recommended_colors:
-            if color.lower() in title_lower:
-                score += 0.5
-        
-        # Check for style tags
-        style_tags = recommendation.get('style_tags', [])
-        for tag in style_tags:
-            if tag.lower() in title_lower:
-                score += 0.3
-        
-        # Check for formality level
-        formality = recommendation.get('formality_level', '').lower()
-        if formality == 'formal' and any(word in title_lower for word in ['business', 'formal', 'dress', 'professional']):
-            score += 0.4
-        elif formality == 'casual' and any(word in title_lower for word in ['casual', 'comfortable', 'relaxed']):
-            score += 0.4
-        
-        return score
+    def _scrape_google_shopping(self, search_term: str) -> List[Dict[str, Any]]:
+        """Fetch and parse a Google Shopping results page (raises if the fetch fails)"""
+        base_url = self.shopping_sites['google_shopping']['url']
+        google_url = f"{base_url}?q={urllib.parse.quote(search_term + ' shopping')}&tbm=shop"
+        
+        products = []
+        for fields in self._fetch_results('google_shopping', google_url, limit=5):  # Limit results
+            product = {
+                'title': fields['title'] or 'N/A',
+                'price': fields['price'] or 'N/A',
+                'url': '',  # Google Shopping doesn't provide direct links easily
+                'image_url': '',
+                'rating': 'N/A',
+                'source': 'Google Shopping',
+                'search_term': search_term
+            }
+            
+            products.append(product)
+        
+        return products
     
     def _remove_duplicates(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Remove duplicate products based on title similarity"""
@@ -260,69 +587,77 @@ class WebSearcher:
         """Sort products by relevance score"""
         return sorted(products, key=lambda x: x.get('relevance_score', 0), reverse=True)
     
-    def _rate_limit(self):
-        """Implement rate limiting to be respectful to websites"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_delay:
-            time.sleep(self.min_delay - time_since_last)
-        
-        self.last_request_time = time.time()
-    
     def search_with_selenium(self, search_term: str, site: str = 'amazon') -> List[Dict[str, Any]]:
         """
         Use Selenium for more complex scraping (when needed)
-        This method is more robust but slower
+        This method is more robust but slower. Browsers come from a shared
+        pool of warm drivers instead of being launched per call.
         """
         try:
-            # Setup Chrome options
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument(f'--user-agent={self.headers["User-Agent"]}')
-            
-            # Initialize driver
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.set_page_load_timeout(30)
+            # Selenium is only needed here, so it is not imported at startup
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
             
             products = []
             
             if site == 'amazon':
                 url = f"https://www.amazon.com/s?k={urllib.parse.quote(search_term)}"
-                driver.get(url)
+                self.rate_limiter.acquire(urllib.parse.urlsplit(url).netloc)
                 
-                # Wait for results to load
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-component-type="s-search-result"]'))
-                )
-                
-                # Extract products
-                product_elements = driver.find_elements(By.CSS_SELECTOR, '[data-component-type="s-search-result"]')
-                
-                for elem in product_elements[:10]:
-                    try:
-                        title = elem.find_element(By.CSS_SELECTOR, 'h2 a span').text
-                        price = elem.find_element(By.CSS_SELECTOR, '.a-price-whole').text
-                        image_url = elem.find_element(By.CSS_SELECTOR, '.s-image').get_attribute('src')
-                        product_url = elem.find_element(By.CSS_SELECTOR, 'h2 a').get_attribute('href')
-                        
-                        products.append({
-                            'title': title,
-                            'price': price,
-                            'url': product_url,
-                            'image_url': image_url,
-                            'source': 'Amazon (Selenium)',
-                            'search_term': search_term
-                        })
-                    except Exception as e:
-                        continue
+                with self.browser_pool.driver() as driver:
+                    driver.get(url)
+                    
+                    # Wait for results to load
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, '[data-component-type="s-search-result"]'))
+                    )
+                    
+                    # Extract products
+                    product_elements = driver.find_elements(By.CSS_SELECTOR, '[data-component-type="s-search-result"]')
+                    
+                    for elem in product_elements[:10]:
+                        try:
+                            title = elem.find_element(By.CSS_SELECTOR, 'h2 a span').text
+                            price = elem.find_element(By.CSS_SELECTOR, '.a-price-whole').text
+                            image_url = elem.find_element(By.CSS_SELECTOR, '.s-image').get_attribute('src')
+                            product_url = elem.find_element(By.CSS_SELECTOR, 'h2 a').get_attribute('href')
+                            
+                            products.append({
+                                'title': title,
+                                'price': price,
+                                'url': product_url,
+                                'image_url': image_url,
+                                'source': 'Amazon (Selenium)',
+                                'search_term': search_term
+                            })
+                        except Exception as e:
+                            continue
             
-            driver.quit()
             return products
             
         except Exception as e:
             print(f"Selenium search error: {e}")
             return []
+    
+    def browser_stats(self) -> Dict[str, Any]:
+        """Browser pool counters, None until Selenium has been used"""
+        with self._browser_pool_lock:
+            return self._browser_pool.stats() if self._browser_pool is not None else None
+    
+    @property
+    def browser_pool(self) -> BrowserPool:
+        """Pool of headless browsers, created the first time Selenium is used"""
+        with self._browser_pool_lock:
+            if self._browser_pool is None:
+                self._browser_pool = BrowserPool(
+                    chrome_driver_factory(
+                        user_agent=self.headers['User-Agent'],
+                        page_load_timeout=30,
+                        block_resources=Config.BROWSER_BLOCK_RESOURCES
+                    ),
+                    max_size=Config.BROWSER_POOL_SIZE,
+                    max_pages=Config.BROWSER_MAX_PAGES,
+                    checkout_timeout=Config.BROWSER_CHECKOUT_TIMEOUT
+                )
+            return self._browser_pool
@@ -170,16 +170,81 @@ const StepNumber = styled.span`
   font-size: 0.9rem;
 `;
 
+// Call onEvent for every line of an NDJSON response as it arrives
+async function readEventStream(response, onEvent) {
+  if (!response.body || !response.body.getReader) {
+    // No streaming support: handle all events once the body is complete
+    const text = await response.text();
+    text.split('\n').filter(line => line.trim()).forEach(line => onEvent(JSON.parse(line)));
+    return;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+
+    const lines = buffered.split('\n');
+    buffered = lines.pop();
+    lines.filter(line => line.trim()).forEach(line => onEvent(JSON.parse(line)));
+
+    if (done) {
+      if (buffered.trim()) {
+        onEvent(JSON.parse(buffered));
+      }
+      return;
+    }
+  }
+}
+
 function App() {
   const [currentStep, setCurrentStep] = useState(1);
   const [uploadedImage, setUploadedImage] = useState(null);
   const [analysisResult, setAnalysisResult] = useState(null);
   const [matchingResults, setMatchingResults] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [isSearching, setIsSearching] = useState(false);
   const [error, setError] = useState(null);
 
+  const handleStreamEvent = (event) => {
+    switch (event.event) {
+      case 'analysis':
+        // Show the analysis while recommendations and products are on their way
+        setAnalysisResult(event.analysis);
+        setCurrentStep(2);
+        setIsLoading(false);
+        break;
+      case 'recommendations':
+        setMatchingResults({ recommendations: event.recommendations, products: [] });
+        setCurrentStep(3);
+        break;
+      case 'products':
+        // Provisional list, best matches first, until the final ranking arrives
+        setMatchingResults(prev => ({
+          ...prev,
+          products: [...prev.products, ...event.products]
+            .sort((a, b) => (b.relevance_score || 0) - (a.relevance_score || 0))
+        }));
+        break;
+      case 'done':
+        setMatchingResults(prev => ({ ...prev, products: event.products }));
+        setIsSearching(false);
+        break;
+      case 'error':
+        setError(event.error || 'Analysis failed');
+        setIsSearching(false);
+        break;
+      default:
+        break;
+    }
+  };
+
   const handleImageUpload = async (imageFile) => {
     setIsLoading(true);
+    setIsSearching(true);
     setError(null);
     
     try {
@@ -191,8 +256,8 @@ function App() {
         style: 'versatile'
       }));
 
-      // Call the combined API endpoint
-      const response = await fetch('/api/analyze-and-match', {
+      // Call the combined API endpoint, streamed as one JSON event per line
+      const response = await fetch('/api/analyze-and-match?stream=ndjson', {
         method: 'POST',
         body: formData,
       });
@@ -201,23 +266,13 @@ function App() {
         throw new Error('Failed to analyze image');
       }
 
-      const result = await response.json();
-      
-      if (result.success) {
-        setUploadedImage(URL.createObjectURL(imageFile));
-        setAnalysisResult(result.analysis);
-        setMatchingResults({
-          recommendations: result.recommendations,
-          products: result.products
-        });
-        setCurrentStep(3);
-      } else {
-        setError(result.error || 'Analysis failed');
-      }
+      setUploadedImage(URL.createObjectURL(imageFile));
+      await readEventStream(response, handleStreamEvent);
     } catch (err) {
       setError(err.message || 'Something went wrong');
     } finally {
       setIsLoading(false);
+      setIsSearching(false);
     }
   };
 
@@ -226,6 +281,7 @@ function App() {
     setUploadedImage(null);
     setAnalysisResult(null);
     setMatchingResults(null);
+    setIsSearching(false);
     setError(null);
   };
 
@@ -308,6 +364,7 @@ function App() {
             results={matchingResults}
             originalAnalysis={analysisResult}
             originalImage={uploadedImage}
+            isSearching={isSearching}
             onReset={handleReset}
           />
         )}
@@ -203,7 +203,7 @@ const NoResults = styled.div`
   }
 `;
 
-const MatchingResults = ({ results, originalAnalysis, originalImage, onReset }) => {
+const MatchingResults = ({ results, originalAnalysis, originalImage, isSearching, onReset }) => {
   const [selectedCategory, setSelectedCategory] = useState('all');
   
   if (!results || !results.products) {
@@ -236,8 +236,12 @@ const MatchingResults = ({ results, originalAnalysis, originalImage, onReset })
   return (
     <ResultsContainer>
       <Header>
-        <Title>Perfect Matches Found! 🎉</Title>
-        <Subtitle>Here are clothing items that would look great with your piece</Subtitle>
+        <Title>{isSearching ? 'Finding Matches...' : 'Perfect Matches Found! 🎉'}</Title>
+        <Subtitle>
+          {isSearching
+            ? 'Searching stores for items that go with your piece. Results appear as they come in.'
+            : 'Here are clothing items that would look great with your piece'}
+        </Subtitle>
         
         <OriginalImageContainer>
           <OriginalImage src={originalImage} alt="Your clothing item" />
@@ -257,10 +261,17 @@ const MatchingResults = ({ results, originalAnalysis, originalImage, onReset })
       </FilterBar>
 
       {filteredProducts.length === 0 ? (
-        <NoResults>
-          <h3>No products found for this category</h3>
-          <p>Try selecting a different category or search again.</p>
-        </NoResults>
+        isSearching ? (
+          <NoResults>
+            <h3>Searching stores...</h3>
+            <p>Matching products will show up here in a moment.</p>
+          </NoResults>
+        ) : (
+          <NoResults>
+            <h3>No products found for this category</h3>
+            <p>Try selecting a different category or search again.</p>
+          </NoResults>
+        )
       ) : (
         <ProductGrid>
           {filteredProducts.map((product, index) => (